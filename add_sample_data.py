@@ -1,6 +1,11 @@
 from app import app, db
 from models import Expense, Income, Category, User
 from datetime import date
+from fx import normalize
+from rollups import rebuild_rollups
+from suggestions import rebuild_suggestions
+from tags import rebuild_tags
+from response_cache import bump_user_data_version
 
 
 def add_sample_data():
@@ -65,18 +70,22 @@ def add_sample_data():
         
         # Add all expenses and incomes
         for expense in sample_expenses:
-            db.session.add(expense)
+            db.session.add(normalize(expense))
         
         for income in sample_incomes:
-            db.session.add(income)
+            db.session.add(normalize(income))
         
+        bump_user_data_version(user.id)
         db.session.commit()
+        rebuild_rollups(user.id)
+        rebuild_suggestions(user.id)
+        rebuild_tags(user.id)
         print("✅ Sample data added successfully!")
         print(f"Added {len(sample_expenses)} expenses and {len(sample_incomes)} incomes")
         
         # Print summary
-        total_expenses = sum(e.amount for e in sample_expenses)
-        total_income = sum(i.amount for i in sample_incomes)
+        total_expenses = sum(e.base_amount for e in sample_expenses)
+        total_income = sum(i.base_amount for i in sample_incomes)
         print(f"\n📊 Summary:")
         print(f"Total Expenses: ₹{total_expenses}")
         print(f"Total Income: ₹{total_income}")
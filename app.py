@@ -1,122 +1,268 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, Response, session
+from flask import (Flask, render_template, stream_template, request, redirect, url_for, flash, jsonify,
+                   Response, session, stream_with_context)
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user, UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, date, timedelta
-from models import db, User, Category, Expense, Income
+from datetime import datetime, date
+from models import db, User, Category, Expense, Income, CategoryBudget
 from config import Config
-import csv
-from io import StringIO
+from dashboard import dashboard_stats, dashboard_series, GRANULARITIES
+from rollups import (record_expense, record_income,
+                     expense_deltas, income_deltas, add_expense_deltas, add_income_deltas)
+from pagination import keyset_page, page_size_from, iter_keyset_rows
+from csv_export import iter_expense_csv, gzip_chunks, EXPORT_COLUMNS
+from reports import report_summary, coalesce_chunks
+from importer import import_expenses_csv, decode_lines
+from suggestions import record_expense_description, record_descriptions, description_entries, suggest, suggest_from_expenses
+from instrumentation import init_instrumentation
+from compression import init_compression
+from assets import init_assets
+from engine_tuning import init_engine_tuning
+from category_cache import get_categories, category_by_id, bump_category_version, invalidate_categories
+from migrations import check_schema
+from tags import sync_expense_tags, clear_expense_tags, filter_by_tag, merge_guest_tags
+from fulltext import ranked_search, match_filter, offset_page, owner_token
+from fx import normalize, to_base
+from recurrence import materialize, first_due
+from bulk import BulkError, ACTIONS, TAG_MODES, MAX_TAGS_LENGTH, validate as validate_bulk, resolve_ids, apply_bulk
+from budgets import check_budgets, budget_status, set_category_budgets, alert_message, recent_alerts
+from response_cache import (init_response_cache, cached, version_key, conditional_get,
+                            bump_data_version, bump_user_data_version)
+import math
+import secrets
 
 app = Flask(__name__)
 app.config.from_object(Config)
 db.init_app(app)
+init_engine_tuning(app, db)
+init_instrumentation(app, db)
+init_response_cache(app)
+init_compression(app)
+init_assets(app)
 login_manager = LoginManager(app)
 login_manager.login_view = "login"
 
 with app.app_context():
-    db.create_all()
+    check_schema(app)
 
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
-def setup_default_categories():
-    default = [
-        {"name": "Food", "color": "#FFB347", "icon": "🍔"},
-        {"name": "Transport", "color": "#B0E0E6", "icon": "🚌"},
-        {"name": "Entertainment", "color": "#FFD700", "icon": "🎮"},
-        {"name": "Health", "color": "#98FB98", "icon": "💊"},
-        {"name": "Utilities", "color": "#87CEEB", "icon": "💡"},
-        {"name": "Shopping", "color": "#FF69B4", "icon": "🛒"},
-        {"name": "Other", "color": "#CCCCCC", "icon": "🔖"},
-    ]
-    if Category.query.count() == 0:
-        for cat in default:
-            category = Category(name=cat["name"], color=cat["color"], icon=cat["icon"])
-            db.session.add(category)
-        db.session.commit()
+# --- Guest mode: rows are owned by a random key kept in the session cookie ---
+def get_guest_key(create=False):
+    key = session.get("guest_key")
+    if key is None and create:
+        key = session["guest_key"] = secrets.token_hex(16)
+    return key
 
-with app.app_context():
-    setup_default_categories()
+@app.before_request
+def upgrade_legacy_guest_session():
+    # Older sessions listed guest row ids in the cookie; move them onto the guest key once.
+    if "guest_expense_ids" not in session and "guest_income_ids" not in session:
+        return
+    eids = session.pop("guest_expense_ids", None) or []
+    iids = session.pop("guest_income_ids", None) or []
+    if current_user.is_authenticated:
+        return
+    key = get_guest_key(create=True)
+    if eids:
+        Expense.query.filter(Expense.id.in_(eids), Expense.user_id.is_(None), Expense.guest_key.is_(None)) \
+            .update({"guest_key": key}, synchronize_session=False)
+    if iids:
+        Income.query.filter(Income.id.in_(iids), Income.user_id.is_(None), Income.guest_key.is_(None)) \
+            .update({"guest_key": key}, synchronize_session=False)
+    bump_data_version()
+    db.session.commit()
+
+def merge_guest_data(user):
+    key = session.pop("guest_key", None)
+    if not key:
+        return
+    q_exp = Expense.query.filter_by(guest_key=key, user_id=None)
+    q_inc = Income.query.filter_by(guest_key=key, user_id=None)
+    deltas = expense_deltas(q_exp)
+    add_expense_deltas(user.id, deltas)
+    add_income_deltas(user.id, income_deltas(q_inc))
+    record_descriptions(user.id, description_entries(q_exp))
+    bump_user_data_version(user.id)
+    merge_guest_tags(q_exp, user.id)
+    q_exp.update({"user_id": user.id, "guest_key": None}, synchronize_session=False)
+    q_inc.update({"user_id": user.id, "guest_key": None}, synchronize_session=False)
+    flash_budget_alerts(user.id, {(day.year, day.month) for day, _ in deltas})
+    db.session.commit()
+
+def flash_budget_alerts(user_id, months):
+    # Call after the write's rollup updates, inside its transaction.
+    categories_by_id = category_by_id()
+    for alert in check_budgets(user_id, months, get_categories()):
+        flash(alert_message(alert, categories_by_id), "warning")
 
 def get_expenses_q():
     if current_user.is_authenticated:
         return Expense.query.filter_by(user_id=current_user.id)
-    else:
-        eids = session.get("guest_expense_ids") or []
-        return Expense.query.filter(Expense.id.in_(eids)) if eids else Expense.query.filter_by(id=None)
+    key = get_guest_key()
+    return Expense.query.filter_by(guest_key=key) if key else Expense.query.filter_by(id=None)
 
 def get_incomes_q():
     if current_user.is_authenticated:
         return Income.query.filter_by(user_id=current_user.id)
-    else:
-        iids = session.get("guest_income_ids") or []
-        return Income.query.filter(Income.id.in_(iids)) if iids else Income.query.filter_by(id=None)
+    key = get_guest_key()
+    return Income.query.filter_by(guest_key=key) if key else Income.query.filter_by(id=None)
+
+def owns_expense(expense):
+    if current_user.is_authenticated:
+        return expense.user_id == current_user.id
+    return expense.user_id is None and expense.guest_key is not None and expense.guest_key == get_guest_key()
+
+@app.before_request
+def materialize_recurring_income():
+    # Catch up the caller's recurring incomes once per day per session (and owner).
+    if request.endpoint in (None, "static"):
+        return
+    if not current_user.is_authenticated and not get_guest_key():
+        return
+    marker = f"{current_owner()}:{date.today()}"
+    if session.get("recurrence_checked") == marker:
+        return
+    session["recurrence_checked"] = marker
+    if materialize(get_incomes_q()) and not current_user.is_authenticated:
+        bump_data_version()
+
+def current_owner():
+    if current_user.is_authenticated:
+        return owner_token(current_user.id)
+    return owner_token(guest_key=get_guest_key())
+
+def search_text(args):
+    return args.get("q", "").strip()[:200]
+
+def parse_expense_filters(args, lenient=False):
+    # Malformed dates raise ValueError, or with lenient (HTML pages) are flashed and ignored.
+    cat_val = args.get("category", "")
+    category_id = int(cat_val) if cat_val.isdigit() else None
+    dates = []
+    for key in ("date_from", "date_to"):
+        value = args.get(key)
+        try:
+            dates.append(datetime.strptime(value, "%Y-%m-%d").date() if value else None)
+        except ValueError:
+            if not lenient:
+                raise ValueError(f"{key} must be YYYY-MM-DD")
+            flash(f"Ignored {key.replace('_', ' ')} {value!r}: dates must be YYYY-MM-DD.", "warning")
+            dates.append(None)
+    tag = args.get("tag", "").strip() or None
+    return category_id, dates[0], dates[1], tag
+
+def filter_expenses(q, category_id=None, dt_from=None, dt_to=None, tag=None):
+    if category_id:
+        q = q.filter_by(category_id=category_id)
+    if dt_from:
+        q = q.filter(Expense.date >= dt_from)
+    if dt_to:
+        q = q.filter(Expense.date <= dt_to)
+    if tag:
+        q = filter_by_tag(q, tag, current_user.id if current_user.is_authenticated else None)
+    return q
 
 @app.route("/", methods=["GET"])
+@conditional_get
 def index():
-    categories = Category.query.all()
-    q_exp = get_expenses_q()
-    q_inc = get_incomes_q()
-    expenses = q_exp.order_by(Expense.date.desc()).limit(10).all()
-    incomes = q_inc.order_by(Income.date.desc()).limit(10).all()
-    today = date.today()
-    start_month = today.replace(day=1)
-    start_week = today - timedelta(days=today.weekday())
-    total_exp_month = sum(e.amount for e in q_exp.filter(Expense.date >= start_month).all())
-    total_inc_month = sum(i.amount for i in q_inc.filter(Income.date >= start_month).all())
-    total_today = sum(e.amount for e in q_exp.filter(Expense.date == today).all())
-    total_week = sum(e.amount for e in q_exp.filter(Expense.date >= start_week).all())
-    user_budget = current_user.monthly_budget if current_user.is_authenticated else 0
-    cat_totals = {cat.name: sum(e.amount for e in q_exp.filter_by(category_id=cat.id).all()) for cat in categories}
-    max_cat_name = max(cat_totals, key=lambda k: cat_totals[k]) if cat_totals else ""
-    max_cat_amt = cat_totals.get(max_cat_name, 0)
-    stats = {
-        "today": total_today,
-        "week": total_week,
-        "month": total_exp_month,
-        "income": total_inc_month,
-        "budget": user_budget,
-        "max_cat_name": max_cat_name,
-        "max_cat_amt": max_cat_amt
-    }
-    alert_budget = user_budget > 0 and total_exp_month >= 0.9 * user_budget
-    trend_labels, trend_data = [], []
-    for d in range(0, 30):
-        day = start_month + timedelta(days=d)
-        if day > today: break
-        amt = sum(e.amount for e in q_exp.filter(Expense.date == day).all())
-        trend_labels.append(day.strftime('%Y-%m-%d'))
-        trend_data.append(amt)
-
-    # Prepare category data for charts
-    category_chart_data = []
-    for cat in categories:
-        total = sum(e.amount for e in q_exp.filter(Expense.category_id==cat.id).all())
-        if total > 0:
-            category_chart_data.append({'name': cat.name, 'icon': cat.icon, 'color': cat.color, 'total': float(total)})
+    # Lightweight shell; stats, charts and recent rows come from /api/dashboard.
     theme = current_user.theme if current_user.is_authenticated else "default"
     show_onboarding = not current_user.is_authenticated and not session.get("onboarded")
     session["onboarded"] = True
     return render_template("index.html",
-        categories=categories,
-        category_chart_data=category_chart_data,
-        expenses=expenses,
-        incomes=incomes,
-        total_month=total_exp_month,
-        cat_totals=cat_totals or {},
-        stats=stats,
-        trend_labels=trend_labels or [],
-        trend_data=trend_data or [],
+        categories=get_categories(),
         theme=theme,
-        alert_budget=alert_budget,
-        show_onboarding=show_onboarding
+        show_onboarding=show_onboarding,
+        granularities=GRANULARITIES,
     )
 
+def parse_dashboard_range(args, today):
+    try:
+        start = date.fromisoformat(args["from"]) if args.get("from") else today.replace(day=1)
+        end = date.fromisoformat(args["to"]) if args.get("to") else today
+    except ValueError:
+        return None
+    granularity = args.get("granularity", "day")
+    if granularity not in GRANULARITIES or start > end:
+        return None
+    # Bound the payload: long ranges need a coarser granularity.
+    if (end - start).days // {"day": 1, "week": 7, "month": 28}[granularity] > app.config["DASHBOARD_MAX_POINTS"]:
+        return None
+    return start, end, granularity
+
+def income_to_dict(i):
+    return {
+        "id": i.id,
+        "date": i.date.isoformat(),
+        "source": i.source,
+        "amount": i.amount,
+        "currency": i.currency,
+        "tags": [t for t in (i.tags or "").split(",") if t],
+        "recurring": bool(i.recurring),
+    }
+
+@app.route("/api/dashboard")
+@conditional_get
+def api_dashboard():
+    today = date.today()
+    parsed = parse_dashboard_range(request.args, today)
+    if parsed is None:
+        return jsonify({"error": "from/to must be YYYY-MM-DD with from <= to, granularity one of "
+                                 + ", ".join(GRANULARITIES) + ", and the range not too long"}), 400
+    start, end, granularity = parsed
+    categories = get_categories()
+    q_exp = get_expenses_q()
+    q_inc = get_incomes_q()
+    user_id = current_user.id if current_user.is_authenticated else None
+    dash = cached(version_key("dashboard"),
+                  lambda: dashboard_stats(q_exp, q_inc, categories, today, user_id=user_id))
+    series = cached(version_key("series", start, end, granularity),
+                    lambda: dashboard_series(q_exp, categories, start, end, granularity, user_id=user_id))
+    budgets = cached(version_key("budgets"), lambda: budget_status(user_id, categories, today)) if user_id else None
+    budget = budgets["total"]["budget"] if budgets else 0
+    categories_dict = category_by_id()
+    return jsonify({
+        "range": {"from": start.isoformat(), "to": end.isoformat(), "granularity": granularity},
+        "stats": {
+            "today": round(dash["today"], 2),
+            "week": round(dash["week"], 2),
+            "month": round(dash["month"], 2),
+            "income": round(dash["income"], 2),
+            "budget": budget,
+            # "near or over budget": a fixed 90%, independent of BUDGET_ALERT_THRESHOLDS
+            "alert_budget": bool(budgets) and (budgets["total"]["percent"] or 0) >= 90,
+            "max_cat_name": dash["max_cat_name"],
+            "max_cat_amt": round(dash["max_cat_amt"], 2),
+        },
+        "trend": series["trend"],
+        "categories": series["categories"],
+        "tags": [{"name": name, "total": round(total, 2), "count": count} for name, total, count in dash["tag_totals"]],
+        "budgets": budgets,
+        "recent_expenses": [expense_to_dict(e, categories_dict.get(e.category_id))
+                            for e in q_exp.order_by(Expense.date.desc(), Expense.id.desc()).limit(10)],
+        "recent_incomes": [income_to_dict(i) for i in q_inc.order_by(Income.date.desc(), Income.id.desc()).limit(10)],
+    })
+
+@app.route("/api/budgets")
+@login_required
+@conditional_get
+def api_budgets():
+    month = request.args.get("month")
+    try:
+        day = datetime.strptime(month, "%Y-%m").date() if month else date.today()
+    except ValueError:
+        return jsonify({"error": "month must be YYYY-MM"}), 400
+    status = budget_status(current_user.id, get_categories(), day)
+    categories_dict = category_by_id()
+    status["alerts"] = [{**a, "message": alert_message(a, categories_dict)} for a in recent_alerts(current_user.id, day)]
+    return jsonify(status)
+
 @app.route("/add", methods=["GET", "POST"])
 def add_expense():
-    categories = Category.query.all()
+    categories = get_categories()
     if request.method == "POST":
         amount = float(request.form["amount"])
         description = request.form["description"]
@@ -127,16 +273,23 @@ def add_expense():
         currency = request.form.get("currency", "INR")
         expense = Expense(amount=amount, description=description, category_id=category_id,
                           date=expense_date, tags=tags, currency=currency)
+        try:
+            normalize(expense)
+        except ValueError as e:
+            flash(str(e), "danger")
+            return render_template("add_expense.html", categories=categories, now=datetime.now)
         if current_user.is_authenticated:
             expense.user_id = current_user.id
             db.session.add(expense)
-            db.session.commit()
+            record_expense(expense)
+            record_expense_description(expense)
+            flash_budget_alerts(current_user.id, [(expense_date.year, expense_date.month)])
         else:
+            expense.guest_key = get_guest_key(create=True)
             db.session.add(expense)
-            db.session.commit()
-            eids = session.get("guest_expense_ids", [])
-            eids.append(expense.id)
-            session["guest_expense_ids"] = eids
+        sync_expense_tags(expense)
+        bump_data_version()
+        db.session.commit()
         flash("Expense added successfully!", "success")
         return redirect(url_for("index"))
     return render_template("add_expense.html", categories=categories, now=datetime.now)
@@ -144,131 +297,261 @@ def add_expense():
 # ... Part 2 will start from here ...
 @app.route("/edit/<int:expense_id>", methods=["GET", "POST"])
 def edit_expense(expense_id):
-    categories = Category.query.all()
+    categories = get_categories()
     expense = Expense.query.get_or_404(expense_id)
-    allow_edit = (current_user.is_authenticated and expense.user_id == current_user.id) or (
-        not current_user.is_authenticated and expense.id in (session.get("guest_expense_ids") or []))
-    if not allow_edit:
+    if not owns_expense(expense):
         flash("Unauthorized", "danger")
         return redirect(url_for("expenses"))
     if request.method == "POST":
-        expense.amount = float(request.form["amount"])
+        amount = float(request.form["amount"])
+        expense_date = datetime.strptime(request.form["date"], "%Y-%m-%d").date()
+        currency = request.form.get("currency", "INR")
+        try:
+            base_amount = to_base(amount, currency, expense_date)
+        except ValueError as e:
+            flash(str(e), "danger")
+            return render_template("edit_expense.html", categories=categories, expense=expense)
+        record_expense(expense, -1)
+        record_expense_description(expense, -1)
+        months = {(expense.date.year, expense.date.month), (expense_date.year, expense_date.month)}
+        expense.amount = amount
         expense.description = request.form["description"]
         expense.category_id = int(request.form["category"])
-        date_str = request.form["date"]
-        expense.date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        expense.date = expense_date
         expense.tags = request.form.get("tags", "")
-        expense.currency = request.form.get("currency", "INR")
+        expense.currency = currency
+        expense.base_amount = base_amount
+        record_expense(expense)
+        record_expense_description(expense)
+        sync_expense_tags(expense)
+        flash_budget_alerts(expense.user_id, months)
+        bump_data_version()
         db.session.commit()
         flash("Expense updated!", "success")
         return redirect(url_for("expenses"))
     return render_template("edit_expense.html", categories=categories, expense=expense)
 
+def expense_page(q, ranked=False):
+    page_size = page_size_from(request.args, app.config["EXPENSES_PAGE_SIZE"], app.config["EXPENSES_MAX_PAGE_SIZE"])
+    if ranked:
+        return offset_page(q, request.args.get("cursor"), page_size)
+    return keyset_page(q, Expense, request.args.get("cursor"), page_size)
+
+def expense_to_dict(e, cat):
+    return {
+        "id": e.id,
+        "date": e.date.strftime('%Y-%m-%d'),
+        "description": e.description,
+        "amount": e.amount,
+        "currency": e.currency,
+        "tags": [t for t in (e.tags or "").split(",") if t],
+        "category": {"id": cat.id, "name": cat.name, "icon": cat.icon, "color": cat.color} if cat else None,
+        "edit_url": url_for("edit_expense", expense_id=e.id),
+        "delete_url": url_for("delete_expense", expense_id=e.id),
+    }
+
+def render_expense_list(q, ranked=False, income_matches=None):
+    categories = get_categories()
+    expenses, next_cursor = expense_page(q, ranked)
+    filters = {k: v for k, v in request.args.items() if k != "cursor"}
+    return render_template("expenses.html", expenses=expenses, categories=categories,
+        categories_by_id=category_by_id(),
+        next_cursor=next_cursor,
+        next_page_url=url_for(request.endpoint, cursor=next_cursor, **filters) if next_cursor else None,
+        api_url=url_for("api_expenses", **filters),
+        export_url=url_for("export_expenses", **filters),
+        print_url=url_for("print_report", **filters),
+        filters=filters,
+        bulk_actions=ACTIONS,
+        tag_modes=TAG_MODES,
+        income_matches=income_matches)
+
 @app.route("/expenses")
+@conditional_get
 def expenses():
-    categories = Category.query.all()
-    q = get_expenses_q()
-    expenses = q.order_by(Expense.date.desc()).all()
-    return render_template("expenses.html", expenses=expenses, categories=categories)
+    return render_expense_list(get_expenses_q())
 
 @app.route("/delete/<int:expense_id>", methods=["POST"])
 def delete_expense(expense_id):
     expense = Expense.query.get_or_404(expense_id)
-    allow_delete = (current_user.is_authenticated and expense.user_id == current_user.id) or (
-        not current_user.is_authenticated and expense.id in (session.get("guest_expense_ids") or []))
-    if not allow_delete:
+    if not owns_expense(expense):
         flash("Unauthorized", "danger")
         return redirect(url_for("expenses"))
+    record_expense(expense, -1)
+    record_expense_description(expense, -1)
+    clear_expense_tags([expense.id])
+    flash_budget_alerts(expense.user_id, [(expense.date.year, expense.date.month)])
     db.session.delete(expense)
+    bump_data_version()
     db.session.commit()
-    if not current_user.is_authenticated:
-        eids = session.get("guest_expense_ids", [])
-        eids = [eid for eid in eids if eid != expense.id]
-        session["guest_expense_ids"] = eids
     flash("Expense deleted!", "info")
     return redirect(url_for("expenses"))
 
 @app.route("/search", methods=["GET"])
+@conditional_get
 def search():
-    category_id = request.args.get("category")
-    date_from = request.args.get("date_from")
-    date_to = request.args.get("date_to")
+    category_id, dt_from, dt_to, tag = parse_expense_filters(request.args, lenient=True)
+    q = filter_expenses(get_expenses_q(), category_id, dt_from, dt_to, tag)
+    ranked = ranked_search(q, Expense, current_owner(), search_text(request.args))
+    if ranked is None:
+        return render_expense_list(q)
+    incomes = ranked_search(get_incomes_q(), Income, current_owner(), search_text(request.args))
+    return render_expense_list(ranked, ranked=True, income_matches=incomes.limit(20).all())
+
+@app.route("/api/expenses")
+def api_expenses():
+    try:
+        category_id, dt_from, dt_to, tag = parse_expense_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    q = filter_expenses(get_expenses_q(), category_id, dt_from, dt_to, tag)
+    ranked = ranked_search(q, Expense, current_owner(), search_text(request.args))
+    rows, next_cursor = expense_page(q) if ranked is None else expense_page(ranked, ranked=True)
+    categories_dict = category_by_id()
+    return jsonify({
+        "expenses": [expense_to_dict(e, categories_dict.get(e.category_id)) for e in rows],
+        "next_cursor": next_cursor,
+    })
+
+# --- Bulk operations: a list of ids or a filter, applied set-based in one transaction ---
+FILTER_KEYS = ("category", "date_from", "date_to", "tag")
+
+def run_bulk(values, ids):
+    # values: mapping with action, category_id, tags, tag_mode, currency and the filter keys
+    action = str(values.get("action") or "")
+    cat_val = str(values.get("category_id") or "")
+    params = {"category_id": int(cat_val) if cat_val.isdigit() else None,
+              "tags": str(values.get("tags") or ""),
+              "tag_mode": str(values.get("tag_mode") or "replace"),
+              "currency": str(values.get("currency") or "").strip().upper() or None}
+    validate_bulk(action, categories_by_id=category_by_id(), **params)
     q = get_expenses_q()
-    if category_id:
-        q = q.filter_by(category_id=category_id)
-    if date_from:
-        dt_from = datetime.strptime(date_from, "%Y-%m-%d").date()
-        q = q.filter(Expense.date >= dt_from)
-    if date_to:
-        dt_to = datetime.strptime(date_to, "%Y-%m-%d").date()
-        q = q.filter(Expense.date <= dt_to)
-    results = q.order_by(Expense.date.desc()).all()
-    categories = Category.query.all()
-    return render_template("expenses.html", expenses=results, categories=categories)
+    if ids is None:
+        filters = {k: str(values[k]) for k in FILTER_KEYS if values.get(k)}
+        if not filters:
+            raise BulkError("select some expenses or give a filter")
+        try:
+            q = filter_expenses(q, *parse_expense_filters(filters))
+        except ValueError as e:
+            raise BulkError(str(e))
+    selected = resolve_ids(q, ids)
+    user_id = current_user.id if current_user.is_authenticated else None
+    months, skipped = apply_bulk(selected, user_id, action, chunk_size=app.config["BULK_CHUNK_SIZE"], **params)
+    alerts = check_budgets(user_id, months, get_categories())
+    bump_data_version()
+    db.session.commit()
+    categories_by_id = category_by_id()
+    return len(selected), len(skipped), [alert_message(a, categories_by_id) for a in alerts]
+
+@app.route("/api/expenses/bulk", methods=["POST"])
+def api_bulk_expenses():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "expected a JSON object"}), 400
+    ids = data.get("ids")
+    if ids is not None and (not isinstance(ids, list) or not ids
+                            or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+        return jsonify({"error": "ids must be a non-empty list of integers"}), 400
+    filters = data.get("filter") or {}
+    if not isinstance(filters, dict):
+        return jsonify({"error": "filter must be an object"}), 400
+    try:
+        count, skipped, alerts = run_bulk({**filters, **data}, ids)
+    except BulkError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"action": str(data["action"]), "matched": count, "skipped": skipped, "budget_alerts": alerts})
+
+@app.route("/bulk", methods=["POST"])
+def bulk_expenses():
+    form = request.form
+    filters = {k: form[k] for k in FILTER_KEYS if form.get(k)}
+    back = url_for("search", **filters) if filters else url_for("expenses")
+    ids = None
+    if form.get("scope") != "filter":
+        raw = form.getlist("ids")
+        if not raw or not all(i.isdigit() for i in raw):
+            flash("Select at least one expense.", "warning")
+            return redirect(back)
+        ids = [int(i) for i in raw]
+    try:
+        count, skipped, alerts = run_bulk(form, ids)
+    except BulkError as e:
+        db.session.rollback()
+        flash(str(e), "danger")
+        return redirect(back)
+    done = {"delete": "deleted", "recategorize": "re-categorized", "retag": "re-tagged", "currency": "converted"}
+    flash(f"{count} expense(s) {done[form['action']]}.", "success")
+    if skipped:
+        flash(f"{skipped} expense(s) not fully re-tagged: tags are limited to {MAX_TAGS_LENGTH} characters.", "warning")
+    for message in alerts:
+        flash(message, "warning")
+    return redirect(back)
 
 @app.route("/suggest_descriptions")
 def suggest_descriptions():
-    q = request.args.get('q', '')
-    suggestions = []
-    base_q = get_expenses_q()
-    if q:
-        results = base_q.filter(Expense.description.ilike(f"%{q}%")).distinct(Expense.description).limit(5).all()
-        suggestions = list({e.description for e in results if e.description.lower().startswith(q.lower())})
-    return jsonify(suggestions)
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify([])
+    if current_user.is_authenticated:
+        return jsonify(suggest(current_user.id, q))
+    return jsonify(suggest_from_expenses(get_expenses_q(), q))
 
 @app.route("/export_expenses")
+@conditional_get
 def export_expenses():
-    category_id = request.args.get("category")
-    date_from = request.args.get("date_from")
-    date_to = request.args.get("date_to")
-    q = get_expenses_q()
-    if category_id:
-        q = q.filter_by(category_id=category_id)
-    if date_from:
-        dt_from = datetime.strptime(date_from, "%Y-%m-%d").date()
-        q = q.filter(Expense.date >= dt_from)
-    if date_to:
-        dt_to = datetime.strptime(date_to, "%Y-%m-%d").date()
-        q = q.filter(Expense.date <= dt_to)
-    expenses = q.order_by(Expense.date.desc()).all()
-    si = StringIO()
-    writer = csv.writer(si)
-    writer.writerow(["Date", "Category", "Description", "Amount", "Tags", "Currency"])
-    categories_dict = {cat.id: cat for cat in Category.query.all()}
-    for e in expenses:
-        cat = categories_dict.get(e.category_id)
-        writer.writerow([
-            e.date.strftime('%Y-%m-%d'),
-            cat.name if cat else "",
-            e.description,
-            e.amount,
-            e.tags,
-            e.currency
-        ])
-    output = si.getvalue()
-    response = Response(output, mimetype="text/csv")
-    response.headers["Content-Disposition"] = "attachment; filename=expenses.csv"
+    try:
+        category_id, dt_from, dt_to, tag = parse_expense_filters(request.args)
+    except ValueError:
+        return redirect(url_for("search", **request.args))  # which flashes the ignored dates
+    q = filter_expenses(get_expenses_q(), category_id, dt_from, dt_to, tag)
+    q = match_filter(q, Expense, current_owner(), search_text(request.args))
+    categories_dict = category_by_id()
+    chunks = iter_expense_csv(q, categories_dict, app.config["EXPORT_BATCH_SIZE"])
+    filename = "expenses.csv"
+    if request.args.get("gzip") == "1":
+        response = Response(stream_with_context(gzip_chunks(chunks)), mimetype="application/gzip")
+        filename += ".gz"
+    else:
+        response = Response(stream_with_context(chunks), mimetype="text/csv")
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
     return response
 
+@app.route("/import_expenses", methods=["GET", "POST"])
+@login_required
+def import_expenses():
+    result = None
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if not upload or not upload.filename:
+            flash("Choose a CSV file to import.", "danger")
+            return render_template("import_expenses.html")
+        result = import_expenses_csv(decode_lines(upload.stream), current_user.id, app.config["IMPORT_BATCH_SIZE"])
+        if result["fatal"]:
+            flash(result["fatal"], "danger")
+        categories_by_id = category_by_id()
+        for alert in result["budget_alerts"]:
+            flash(alert_message(alert, categories_by_id), "warning")
+    return render_template("import_expenses.html", result=result)
+
 @app.route("/print_report")
+@conditional_get
 def print_report():
-    category_id = request.args.get("category")
-    date_from = request.args.get("date_from")
-    date_to = request.args.get("date_to")
-    q = get_expenses_q()
-    if category_id:
-        q = q.filter_by(category_id=category_id)
-    if date_from:
-        dt_from = datetime.strptime(date_from, "%Y-%m-%d").date()
-        q = q.filter(Expense.date >= dt_from)
-    if date_to:
-        dt_to = datetime.strptime(date_to, "%Y-%m-%d").date()
-        q = q.filter(Expense.date <= dt_to)
-    expenses = q.order_by(Expense.date.asc()).all()
-    categories = Category.query.all()
-    total = sum(e.amount for e in expenses)
-    now = datetime.now
-    return render_template("print_report.html", expenses=expenses, categories=categories, total=total, now=now)
+    try:
+        category_id, dt_from, dt_to, tag = parse_expense_filters(request.args)
+    except ValueError:
+        return redirect(url_for("search", **request.args))  # which flashes the ignored dates
+    text_query = search_text(request.args)
+    q = filter_expenses(get_expenses_q(), category_id, dt_from, dt_to, tag)
+    q = match_filter(q, Expense, current_owner(), text_query)
+    categories_by_id = category_by_id()
+    # Rollups carry no tags or text, so such reports are summarised from the rows.
+    user_id = current_user.id if current_user.is_authenticated and not (tag or text_query) else None
+    summary = report_summary(q, categories_by_id, user_id, category_id, dt_from, dt_to)
+    rows = iter_keyset_rows(q.with_entities(*EXPORT_COLUMNS), Expense, app.config["EXPORT_BATCH_SIZE"], descending=False)
+    chunks = stream_template("print_report.html", expenses=rows, categories_by_id=categories_by_id,
+                             total=summary["total"], summary=summary, now=datetime.now)
+    return Response(coalesce_chunks(chunks), mimetype="text/html")
 
 @app.route("/add_category", methods=["GET", "POST"])
 def add_category():
@@ -280,7 +563,9 @@ def add_category():
         if name and color and icon:
             cat = Category(name=name, color=color, icon=icon, budget=budget)
             db.session.add(cat)
+            bump_category_version()
             db.session.commit()
+            invalidate_categories()
             flash("Category added!", "success")
             return redirect(url_for("expenses"))
         flash("All fields required.", "danger")
@@ -289,7 +574,7 @@ def add_category():
 # --- INCOME CRUD, safe int input ---
 @app.route("/add_income", methods=["GET", "POST"])
 def add_income():
-    categories = Category.query.all()
+    categories = get_categories()
     if request.method == "POST":
         amount = float(request.form["amount"])
         source = request.form["source"]
@@ -304,16 +589,24 @@ def add_income():
         income = Income(amount=amount, source=source, date=income_date,
                         recurring=recurring, interval=interval, category_id=category_id,
                         currency=currency, tags=tags)
+        try:
+            normalize(income)
+        except ValueError as e:
+            flash(str(e), "danger")
+            return render_template("add_income.html", categories=categories, now=datetime.now)
+        income.next_due = first_due(income)
         if current_user.is_authenticated:
             income.user_id = current_user.id
             db.session.add(income)
-            db.session.commit()
+            record_income(income)
         else:
+            income.guest_key = get_guest_key(create=True)
             db.session.add(income)
-            db.session.commit()
-            iids = session.get("guest_income_ids", [])
-            iids.append(income.id)
-            session["guest_income_ids"] = iids
+        bump_data_version()
+        db.session.commit()
+        if income.next_due is not None:
+            # A back-dated recurring income catches up right away.
+            materialize(get_incomes_q().filter(Income.id == income.id))
         flash("Income added successfully!", "success")
         return redirect(url_for("index"))
     return render_template("add_income.html", categories=categories, now=datetime.now)
@@ -325,22 +618,51 @@ def add_income():
 def help():
     return render_template("help.html")
 
+def parse_budget(value):
+    amount = float(value)
+    if not math.isfinite(amount) or amount < 0:
+        raise ValueError(f"invalid budget {value!r}")
+    return amount
+
 @app.route("/profile", methods=["GET", "POST"])
 @login_required
 def profile():
+    categories = get_categories()
     if request.method == "POST":
-        budget = float(request.form.get("monthly_budget", 0))
-        current_user.monthly_budget = budget
+        invalid = []
+        value = request.form.get("monthly_budget", "").strip()
+        if value:
+            try:
+                current_user.monthly_budget = parse_budget(value)
+            except ValueError:
+                invalid.append(f"monthly budget ({value})")
+        # Blank = use the category's default budget; an invalid amount keeps the current one
+        amounts = {}
+        for cat in categories:
+            value = request.form.get(f"budget_{cat.id}", "").strip()
+            try:
+                amounts[cat.id] = parse_budget(value) if value else None
+            except ValueError:
+                invalid.append(f"{cat.name} ({value})")
+        if invalid:
+            flash("Budgets must be numbers of 0 or more; not saved: " + ", ".join(invalid), "danger")
+        set_category_budgets(current_user.id, amounts)
+        today = date.today()
+        flash_budget_alerts(current_user.id, [(today.year, today.month)])
+        bump_data_version()
         db.session.commit()
         flash("Profile updated!", "success")
         return redirect(url_for("profile"))
-    return render_template("profile.html")
+    overrides = {b.category_id: b.amount for b in CategoryBudget.query.filter_by(user_id=current_user.id)}
+    return render_template("profile.html", categories=categories, overrides=overrides,
+                           budgets=budget_status(current_user.id, categories))
 
 @app.route("/set_theme")
 @login_required
 def set_theme():
     theme = request.args.get("theme", "default")
     current_user.theme = theme
+    bump_data_version()
     db.session.commit()
     return ("",204)
 
@@ -370,6 +692,7 @@ def signup():
         db.session.add(u)
         db.session.commit()
         login_user(u)
+        merge_guest_data(u)
         flash("Account created and signed in!", "success")
         return redirect(url_for("index"))
     return render_template("signup.html")
@@ -384,19 +707,7 @@ def login():
         user = User.query.filter_by(username=username).first()
         if user and check_password_hash(user.password, password):
             login_user(user)
-            guest_ids = session.get("guest_expense_ids", [])
-            for eid in guest_ids:
-                exp = Expense.query.get(eid)
-                if exp and not exp.user_id:
-                    exp.user_id = user.id
-            guest_iids = session.get("guest_income_ids", [])
-            for iid in guest_iids:
-                inc = Income.query.get(iid)
-                if inc and not inc.user_id:
-                    inc.user_id = user.id
-            db.session.commit()
-            session.pop("guest_expense_ids", None)
-            session.pop("guest_income_ids", None)
+            merge_guest_data(user)
             flash("Logged in successfully!", "success")
             return redirect(url_for("index"))
         flash("Invalid username or password.", "danger")
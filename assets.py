@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import shutil
+from flask import current_app, send_from_directory
+from compression import SUFFIXES, brotli, brotli_bytes, gzip_bytes, negotiate
+
+# --- Fingerprinted, precompressed static assets ---
+# `python build_assets.py` copies every file under static/ to static/dist/ with a
+# content hash in its name (css/style.css -> dist/css/style.1a2b3c4d5e.css), writes
+# .br/.gz variants of text assets next to the copy and records both in
+# ASSET_MANIFEST. url_for('static', filename=...) then returns the hashed name,
+# served with a year-long immutable Cache-Control in the smallest encoding the
+# client accepts: a changed file gets a new URL, so browsers never revalidate.
+# Files without a manifest entry, or changed since the build, keep their plain
+# URL and Flask's default (revalidated) static serving.
+
+logger = logging.getLogger("expense_tracker.assets")
+
+DIST = "dist"
+COMPRESSIBLE = {"text/css", "text/javascript", "application/javascript", "application/json",
+                "image/svg+xml", "text/plain"}
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+def _mimetype(filename):
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+def _sources(static_folder):
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder and DIST in dirs:
+            dirs.remove(DIST)
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, static_folder).replace(os.sep, "/"), path
+
+def build_assets(static_folder, manifest_path):
+    """Write hashed copies and compressed variants into static/dist; returns the manifest."""
+    dist = os.path.join(static_folder, DIST)
+    shutil.rmtree(dist, ignore_errors=True)
+    manifest = {}
+    for filename, path in _sources(static_folder):
+        with open(path, "rb") as f:
+            data = f.read()
+        stem, ext = os.path.splitext(filename)
+        hashed = f"{DIST}/{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+        target = os.path.join(static_folder, *hashed.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(data)
+        variants = {}
+        if _mimetype(filename) in COMPRESSIBLE:
+            if brotli is not None:
+                variants["br"] = brotli_bytes(data)
+            variants["gzip"] = gzip_bytes(data)
+        encodings = []
+        for encoding, compressed in variants.items():
+            if len(compressed) < len(data):  # tiny files can grow
+                with open(target + SUFFIXES[encoding], "wb") as f:
+                    f.write(compressed)
+                encodings.append(encoding)
+        stat = os.stat(path)
+        manifest[filename] = {"path": hashed, "size": stat.st_size, "mtime": stat.st_mtime, "encodings": encodings}
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+def load_manifest(static_folder, manifest_path):
+    """Manifest entries whose source is unchanged since the build (by size and mtime)."""
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    current = {}
+    for filename, entry in manifest.items():
+        try:
+            stat = os.stat(os.path.join(static_folder, filename))
+        except FileNotFoundError:
+            continue
+        built = os.path.exists(os.path.join(static_folder, entry["path"]))
+        if not built or stat.st_size != entry["size"] or stat.st_mtime != entry["mtime"]:
+            logger.warning("static/%s changed since the last build_assets.py run; serving it unhashed", filename)
+            continue
+        current[filename] = entry
+    return current
+
+def init_assets(app):
+    if not app.config.get("ASSET_FINGERPRINTS") or not app.has_static_folder:
+        return None
+    manifest = load_manifest(app.static_folder, app.config["ASSET_MANIFEST"])
+    if not manifest:
+        return None
+    urls = {filename: entry["path"] for filename, entry in manifest.items()}
+    served = {entry["path"]: (_mimetype(filename), tuple(entry["encodings"])) for filename, entry in manifest.items()}
+
+    @app.url_defaults
+    def fingerprint_static_url(endpoint, values):
+        if endpoint == "static" and values.get("filename") in urls:
+            values["filename"] = urls[values["filename"]]
+
+    def serve_static(filename):
+        if filename not in served:
+            return current_app.send_static_file(filename)
+        mimetype, encodings = served[filename]
+        encoding = negotiate(encodings) if encodings else None
+        path = filename + SUFFIXES[encoding] if encoding else filename
+        response = send_from_directory(current_app.static_folder, path, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        if encodings:
+            response.vary.add("Accept-Encoding")
+        if encoding:
+            response.content_encoding = encoding
+        return response
+
+    app.view_functions["static"] = serve_static
+    app.extensions["assets"] = urls
+    return urls
@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+# --- Route benchmark on synthetic data ---
+# Seeds a throwaway database (unless DATABASE_URL is set) with seed_data.generate(),
+# drives each route through the Flask test client and writes latency percentiles,
+# SQL query counts, response bytes and peak traced memory as JSON for comparison
+# across commits, plus the requests and bytes a browser spends loading a page.
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def bench_routes(today):
+    month = today.replace(day=1).isoformat()
+    year_ago = (today - timedelta(days=365)).isoformat()
+    return {
+        "index": "/",
+        "api_dashboard": f"/api/dashboard?from={year_ago}&granularity=week",
+        "expenses": "/expenses",
+        "search": f"/search?category=1&date_from={year_ago}&date_to={today.isoformat()}",
+        "search_text": "/search?q=coffee",
+        "search_tag": f"/search?tag=food&date_from={year_ago}",
+        "api_expenses": f"/api/expenses?date_from={month}",
+        "export_expenses": f"/export_expenses?date_from={year_ago}",
+        "print_report": f"/print_report?date_from={year_ago}",
+        "suggest_descriptions": "/suggest_descriptions?q=co",
+    }
+
+def _consume(response):
+    size = 0
+    for chunk in response.response:
+        size += len(chunk)
+    response.close()
+    return size
+
+def run(client, engine, url, iterations, warmup, headers=None):
+    from sqlalchemy import event
+    counter = {"queries": 0}
+    def count(*args):
+        counter["queries"] += 1
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        for _ in range(warmup):
+            _consume(client.get(url, buffered=False, headers=headers))
+        latencies, queries, status, size = [], [], None, 0
+        for _ in range(iterations):
+            counter["queries"] = 0
+            started = time.perf_counter()
+            response = client.get(url, buffered=False, headers=headers)
+            status = response.status_code
+            size = _consume(response)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(counter["queries"])
+        tracemalloc.start()
+        _consume(client.get(url, buffered=False, headers=headers))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    latencies.sort()
+    return {
+        "url": url,
+        "status": status,
+        "bytes": size,
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "max_ms": round(latencies[-1], 3),
+        "queries": max(queries),
+        "peak_mem_mb": round(peak / 1e6, 3),
+    }
+
+STATIC_REF = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+def _cached_without_request(response):
+    return response.cache_control.immutable or (response.cache_control.max_age or 0) > 0
+
+def page_load(client, url, headers=None):
+    """Requests and body bytes for a first and a repeat view of url and its same-origin static files.
+
+    The repeat view models a browser cache: fresh (max-age/immutable) responses are
+    reused without a request, everything else is revalidated with its validators.
+    """
+    headers = dict(headers or {})
+    page = client.get(url, headers=headers)
+    responses = {url: page}
+    html = client.get(url).get_data(as_text=True)  # uncompressed copy to find the asset URLs
+    for ref in dict.fromkeys(STATIC_REF.findall(html)):
+        responses[ref] = client.get(ref, headers=headers)
+    first = {"requests": len(responses), "bytes": sum(len(r.data) for r in responses.values())}
+    repeat = {"requests": 0, "bytes": 0, "not_modified": 0}
+    for ref, response in responses.items():
+        if _cached_without_request(response):
+            continue
+        conditional = dict(headers)
+        if response.headers.get("ETag"):
+            conditional["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            conditional["If-Modified-Since"] = response.headers["Last-Modified"]
+        again = client.get(ref, headers=conditional)
+        repeat["requests"] += 1
+        repeat["bytes"] += len(again.data)
+        repeat["not_modified"] += again.status_code == 304
+        again.close()
+    for response in responses.values():
+        response.close()
+    return {"url": url, "assets": len(responses) - 1, "first_view": first, "repeat_view": repeat}
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous, current):
+    print(f"\n{'route':<22}{'p50 before':>12}{'p50 now':>10}{'change':>9}{'queries':>13}{'peak MB':>15}{'bytes':>22}")
+    for name, now in current["routes"].items():
+        before = previous.get("routes", {}).get(name)
+        if not before:
+            continue
+        change = (now["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0.0
+        print(f"{name:<22}{before['p50_ms']:>12.2f}{now['p50_ms']:>10.2f}{change:>+8.1f}%"
+              f"{before['queries']:>6} -> {now['queries']:<4}{before['peak_mem_mb']:>7.1f} -> {now['peak_mem_mb']:<5.1f}"
+              f"{before['bytes']:>10} -> {now['bytes']}")
+    for name, now in current.get("page_load", {}).items():
+        before = previous.get("page_load", {}).get(name)
+        if before:
+            print(f"{name + ' page load':<22}" + "  ".join(
+                f"{view.replace('_', ' ')} {before[view]['requests']} -> {now[view]['requests']} requests, "
+                f"{before[view]['bytes']} -> {now[view]['bytes']} bytes" for view in ("first_view", "repeat_view")))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark routes against synthetic data.")
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--expenses-per-user", type=int, default=20000)
+    parser.add_argument("--incomes-per-user", type=int, default=24)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--routes", help="comma-separated subset of route names")
+    parser.add_argument("--accept-encoding", default="gzip, deflate, br",
+                        help="Accept-Encoding sent with every request ('' for none)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    # After warmup every sample would be a stats-cache hit; set RESPONSE_CACHE_BACKEND=memory
+    # explicitly to measure warm-cache latency instead of the rollup queries.
+    os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+    from app import app, db
+    from seed_data import generate
+
+    today = date.today()
+    routes = bench_routes(today)
+    if args.routes:
+        routes = {name: url for name, url in routes.items() if name in args.routes.split(",")}
+
+    with app.app_context():
+        print(f"Seeding {args.users} user(s) x {args.expenses_per_user} expenses...")
+        started = time.time()
+        generate(args.users, args.expenses_per_user, args.incomes_per_user, args.days, args.seed,
+                 prefix="bench", password="bench", verbose=False)
+        seed_seconds = time.time() - started
+        engine = db.engine
+
+    client = app.test_client()
+    client.post("/login", data={"username": "bench0", "password": "bench"})
+    headers = {"Accept-Encoding": args.accept_encoding} if args.accept_encoding else {}
+    results = {}
+    for name, url in routes.items():
+        results[name] = run(client, engine, url, args.iterations, args.warmup, headers)
+        r = results[name]
+        print(f"{name:<22} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  "
+              f"queries {r['queries']:>3}  peak {r['peak_mem_mb']:>8.2f} MB  {r['bytes']} bytes")
+    page_loads = {}
+    for name in ("index", "expenses"):
+        if name in routes:
+            page_loads[name] = p = page_load(client, routes[name], headers)
+            print(f"{name + ' page load':<22} first view {p['first_view']['requests']} requests "
+                  f"{p['first_view']['bytes']} bytes, repeat view {p['repeat_view']['requests']} requests "
+                  f"{p['repeat_view']['bytes']} bytes")
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "database": app.config["SQLALCHEMY_DATABASE_URI"].split(":", 1)[0],
+        "response_cache": app.config["RESPONSE_CACHE_BACKEND"],
+        "params": {k: getattr(args, k) for k in ("users", "expenses_per_user", "incomes_per_user",
+                                                 "days", "seed", "iterations", "warmup", "accept_encoding")},
+        "seed_seconds": round(seed_seconds, 2),
+        "routes": results,
+        "page_load": page_loads,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+from datetime import date, datetime
+from flask import current_app
+from models import db, User, CategoryBudget, BudgetAlert, CategoryMonthlyRollup, MonthlyRollup
+from rollups import dialect_insert
+
+# --- Monthly budgets per user and category, checked against the rollup counters ---
+# Spend per (user, month, category) is the CategoryMonthlyRollup counter kept by
+# every expense write (the whole month is MonthlyRollup.expense_total), so status
+# costs O(categories). Writes call check_budgets() for the months they touched:
+# each BUDGET_ALERT_THRESHOLDS percentage reached for the first time becomes a
+# BudgetAlert row, and alerts above the current level are dropped when spend falls
+# back, so the next crossing is reported again.
+
+TOTAL = -1  # category_id of the whole monthly budget (User.monthly_budget)
+
+def thresholds():
+    return sorted(current_app.config["BUDGET_ALERT_THRESHOLDS"])
+
+def budget_amounts(user_id, categories):
+    """{category_id: monthly budget} with TOTAL for the overall one; 0 means no budget."""
+    amounts = {cat.id: cat.budget or 0 for cat in categories}
+    amounts.update({category_id: amount for category_id, amount in
+                    db.session.query(CategoryBudget.category_id, CategoryBudget.amount)
+                    .filter(CategoryBudget.user_id == user_id)})
+    user = db.session.get(User, user_id)
+    amounts[TOTAL] = (user.monthly_budget or 0) if user else 0
+    return amounts
+
+def spend_counters(user_id, year, month):
+    spent = {category_id: amount for category_id, amount in
+             db.session.query(CategoryMonthlyRollup.category_id, CategoryMonthlyRollup.amount)
+             .filter_by(user_id=user_id, year=year, month=month)}
+    total = db.session.query(MonthlyRollup.expense_total).filter_by(user_id=user_id, year=year, month=month).scalar()
+    spent[TOTAL] = total or 0
+    return spent
+
+def level(spent, budget):
+    """Highest threshold reached (0 if none, or no budget)."""
+    if not budget or budget <= 0:
+        return 0
+    pct = spent / budget * 100
+    return max((t for t in thresholds() if pct >= t), default=0)
+
+def check_budgets(user_id, months, categories):
+    """Record threshold crossings for the given (year, month)s; returns the new alerts, worst first."""
+    if user_id is None or not months:
+        return []
+    budgets = budget_amounts(user_id, categories)
+    crossings = []
+    for year, month in sorted(set(months)):
+        spent = spend_counters(user_id, year, month)
+        alerted = {(a.category_id, a.threshold) for a in BudgetAlert.query.filter_by(
+            user_id=user_id, year=year, month=month)}
+        new_rows = []
+        for category_id, budget in budgets.items():
+            reached = level(spent.get(category_id, 0), budget)
+            stale = [t for c, t in alerted if c == category_id and t > reached]
+            if stale:
+                BudgetAlert.query.filter(BudgetAlert.user_id == user_id, BudgetAlert.year == year,
+                                         BudgetAlert.month == month, BudgetAlert.category_id == category_id,
+                                         BudgetAlert.threshold.in_(stale)).delete(synchronize_session=False)
+            for t in thresholds():
+                if t <= reached and (category_id, t) not in alerted:
+                    new_rows.append({"user_id": user_id, "year": year, "month": month, "category_id": category_id,
+                                     "threshold": t, "spent": spent.get(category_id, 0), "budget": budget,
+                                     "created_at": datetime.now()})
+        if new_rows:
+            insert = dialect_insert()
+            if insert is not None:
+                db.session.execute(insert(BudgetAlert).on_conflict_do_nothing(), new_rows)
+            else:
+                db.session.execute(BudgetAlert.__table__.insert(), new_rows)
+            # Only the highest new threshold per budget is worth telling the user about.
+            top = {}
+            for row in new_rows:
+                if row["threshold"] > top.get(row["category_id"], {}).get("threshold", 0):
+                    top[row["category_id"]] = row
+            crossings.extend(top.values())
+    return sorted(crossings, key=lambda r: (-r["threshold"], r["category_id"]))
+
+def budget_status(user_id, categories, day=None):
+    """Budget, spend and level per category (plus the overall budget) for day's month."""
+    day = day or date.today()
+    budgets = budget_amounts(user_id, categories)
+    spent = spend_counters(user_id, day.year, day.month)
+
+    def entry(budget, amount):
+        return {"budget": round(budget, 2), "spent": round(amount, 2),
+                "percent": round(amount / budget * 100, 1) if budget > 0 else None, "level": level(amount, budget)}
+
+    return {
+        "month": day.strftime("%Y-%m"),
+        "total": entry(budgets[TOTAL], spent[TOTAL]),
+        "categories": [{"id": cat.id, "name": cat.name, "icon": cat.icon, "color": cat.color,
+                        **entry(budgets.get(cat.id, 0), spent.get(cat.id, 0))}
+                       for cat in categories if budgets.get(cat.id, 0) > 0 or spent.get(cat.id, 0) > 0],
+    }
+
+def recent_alerts(user_id, day=None, limit=10):
+    """Alerts raised for day's month, newest first."""
+    day = day or date.today()
+    rows = (BudgetAlert.query.filter_by(user_id=user_id, year=day.year, month=day.month)
+            .order_by(BudgetAlert.created_at.desc(), BudgetAlert.threshold.desc()).limit(limit))
+    return [{"category_id": a.category_id, "year": a.year, "month": a.month, "threshold": a.threshold,
+             "spent": round(a.spent, 2), "budget": round(a.budget, 2), "created_at": a.created_at.isoformat()}
+            for a in rows]
+
+def set_category_budgets(user_id, amounts):
+    """amounts: {category_id: amount, or None to fall back to the category default}."""
+    rows = {r.category_id: r for r in CategoryBudget.query.filter_by(user_id=user_id)}
+    for category_id, amount in amounts.items():
+        row = rows.get(category_id)
+        if amount is None:
+            if row is not None:
+                db.session.delete(row)
+        elif row is None:
+            db.session.add(CategoryBudget(user_id=user_id, category_id=category_id, amount=amount))
+        else:
+            row.amount = amount
+    db.session.flush()
+
+def alert_message(alert, categories_by_id):
+    if alert["category_id"] == TOTAL:
+        name = "Monthly budget"
+    else:
+        cat = categories_by_id.get(alert["category_id"])
+        name = f"{cat.icon} {cat.name} budget" if cat else "Category budget"
+    when = date(alert["year"], alert["month"], 1).strftime("%B %Y")
+    return (f"{name}: {alert['threshold']}% used for {when} "
+            f"(₹{alert['spent']:,.2f} of ₹{alert['budget']:,.2f})")
@@ -0,0 +1,19 @@
+import os
+from assets import build_assets
+from compression import brotli
+from config import Config
+
+# Deploy step (see Procfile): fingerprints and precompresses static/ into static/dist
+# and writes the manifest that url_for('static', ...) reads at startup.
+def main():
+    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+    manifest = build_assets(static_folder, Config.ASSET_MANIFEST)
+    for filename, entry in sorted(manifest.items()):
+        encodings = ", ".join(entry["encodings"]) or "uncompressed"
+        print(f"  {filename} -> {entry['path']} ({encodings})")
+    if brotli is None:
+        print("⚠️ Brotli is not installed: only gzip variants were written")
+    print(f"✅ {len(manifest)} static asset(s) fingerprinted, manifest at {Config.ASSET_MANIFEST}")
+
+if __name__ == "__main__":
+    main()
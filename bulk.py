@@ -0,0 +1,123 @@
+from datetime import date
+from sqlalchemy import case, exists, func, literal, or_, select
+from models import db, Expense, ExpenseTag
+from rollups import expense_deltas, add_expense_deltas
+from suggestions import description_entries, record_descriptions
+from tags import parse_tags, tag_ids, clear_expense_tags
+from fx import rate_for, rebase
+
+# --- Bulk expense operations: set-based statements in the caller's transaction ---
+# The selection is resolved to ids once (which is also the ownership check), then
+# each chunk of ids gets a handful of UPDATE/DELETEs plus the same derived-data
+# maintenance as single writes: rollups from before/after deltas, description
+# usage counts on delete and tag links. Budgets are checked once for every month
+# touched. The caller bumps the data version and commits.
+
+ACTIONS = ("delete", "recategorize", "retag", "currency")
+TAG_MODES = ("replace", "add", "remove")
+MAX_TAGS_LENGTH = Expense.tags.type.length
+
+class BulkError(ValueError):
+    pass
+
+def resolve_ids(q_owned, ids=None):
+    """Ids of the selected expenses. With explicit ids, all of them must be in q_owned."""
+    if ids is None:
+        return [i for (i,) in q_owned.with_entities(Expense.id).order_by(Expense.id)]
+    wanted = set(ids)
+    found = [i for (i,) in q_owned.filter(Expense.id.in_(wanted)).with_entities(Expense.id).order_by(Expense.id)]
+    if len(found) != len(wanted):
+        raise BulkError(f"{len(wanted) - len(found)} of the selected expenses do not exist or are not yours")
+    return found
+
+def _negate(deltas):
+    return {key: (-amount, -count) for key, (amount, count) in deltas.items()}
+
+def _months(deltas):
+    return {(day.year, day.month) for day, _ in deltas}
+
+def _link_tag(tag_id, condition):
+    db.session.execute(ExpenseTag.__table__.insert().from_select(
+        ["expense_id", "tag_id", "user_id"],
+        select(Expense.id, literal(tag_id), Expense.user_id).where(condition)))
+
+def _retag(chunk, chunk_q, names, mode):
+    """Returns the ids of expenses that had no room left in Expense.tags for an added tag."""
+    in_chunk = Expense.id.in_(chunk)
+    if mode == "replace":
+        chunk_q.update({"tags": ",".join(names)}, synchronize_session=False)
+        clear_expense_tags(chunk)
+        for tag_id in tag_ids(names).values():
+            _link_tag(tag_id, in_chunk)
+        return set()
+    full = set()
+    for name, tag_id in tag_ids(names).items():
+        linked = exists().where(ExpenseTag.expense_id == Expense.id, ExpenseTag.tag_id == tag_id)
+        if mode == "add":
+            fits = func.length(func.coalesce(Expense.tags, "")) + len(name) + 1 <= MAX_TAGS_LENGTH
+            full.update(i for (i,) in chunk_q.filter(~linked, ~fits).with_entities(Expense.id))
+            chunk_q.filter(~linked, fits).update(
+                {"tags": case((or_(Expense.tags.is_(None), Expense.tags == ""), name),
+                              else_=Expense.tags + "," + name)}, synchronize_session=False)
+            _link_tag(tag_id, in_chunk & ~linked & fits)
+        else:
+            # Expense.tags is canonical ("a,b"), so the name can be cut out between commas.
+            padded = db.func.replace("," + Expense.tags + ",", f",{name},", ",")
+            chunk_q.filter(linked).update({"tags": db.func.ltrim(db.func.rtrim(padded, ","), ",")},
+                                          synchronize_session=False)
+            ExpenseTag.query.filter(ExpenseTag.expense_id.in_(chunk), ExpenseTag.tag_id == tag_id) \
+                .delete(synchronize_session=False)
+    return full
+
+def validate(action, category_id=None, tags=None, tag_mode="replace", currency=None, categories_by_id=None):
+    if action not in ACTIONS:
+        raise BulkError("action must be one of " + ", ".join(ACTIONS))
+    if action == "recategorize" and category_id not in (categories_by_id or {}):
+        raise BulkError("choose an existing category")
+    if action == "retag":
+        if tag_mode not in TAG_MODES:
+            raise BulkError("tag mode must be one of " + ", ".join(TAG_MODES))
+        if tag_mode != "replace" and not parse_tags(tags):
+            raise BulkError("give at least one tag to add or remove")
+        if len(",".join(parse_tags(tags))) > MAX_TAGS_LENGTH:
+            raise BulkError(f"tags must be at most {MAX_TAGS_LENGTH} characters")
+    if action == "currency":
+        if not currency or len(currency) > 8:
+            raise BulkError("invalid currency")
+        try:
+            rate_for(currency, date.today())
+        except ValueError as e:
+            raise BulkError(str(e))
+
+def apply_bulk(ids, user_id, action, category_id=None, tags=None, tag_mode="replace", currency=None,
+               chunk_size=1000):
+    """Apply action to the (already authorized) expense ids.
+
+    Returns the (year, month)s whose spend changed and the ids left unchanged because
+    an added tag did not fit in Expense.tags.
+    """
+    months, skipped = set(), set()
+    names = parse_tags(tags) if action == "retag" else []
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        chunk_q = Expense.query.filter(Expense.id.in_(chunk))
+        changes_spend = action != "retag"
+        if changes_spend:
+            before = expense_deltas(chunk_q)
+            add_expense_deltas(user_id, _negate(before))
+            months |= _months(before)
+        if action == "delete":
+            record_descriptions(user_id, ((d, day, -count) for d, day, count in description_entries(chunk_q)))
+            clear_expense_tags(chunk)
+            chunk_q.delete(synchronize_session=False)
+            continue
+        if action == "recategorize":
+            chunk_q.update({"category_id": category_id}, synchronize_session=False)
+        elif action == "currency":
+            chunk_q.update({"currency": currency}, synchronize_session=False)
+            rebase(chunk_q, Expense)
+        else:
+            skipped |= _retag(chunk, chunk_q, names, tag_mode)
+        if changes_spend:
+            add_expense_deltas(user_id, expense_deltas(chunk_q))
+    return months, skipped
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import namedtuple
+from flask import current_app
+from models import db, Category, CacheVersion
+
+# --- In-process Category cache ---
+# Each worker keeps an immutable snapshot of all categories. add_category bumps a
+# version counter in the database; other workers notice it on their next check,
+# which happens at most once every CATEGORY_CACHE_TTL seconds.
+
+CategoryInfo = namedtuple("CategoryInfo", "id name color icon budget")
+
+VERSION_KEY = "category"
+
+_lock = threading.Lock()
+_snapshot = {"version": None, "categories": (), "by_id": {}, "by_name": {}, "checked_at": 0.0}
+
+def _db_version():
+    row = db.session.get(CacheVersion, VERSION_KEY)
+    return row.version if row else 0
+
+def _refresh():
+    global _snapshot
+    snap = _snapshot
+    now = time.monotonic()
+    if snap["version"] is not None and now - snap["checked_at"] < current_app.config["CATEGORY_CACHE_TTL"]:
+        return snap
+    with _lock:
+        version = _db_version()
+        if version != _snapshot["version"]:
+            cats = tuple(CategoryInfo(c.id, c.name, c.color, c.icon, c.budget or 0)
+                         for c in Category.query.order_by(Category.id))
+            _snapshot = {"version": version, "categories": cats,
+                         "by_id": {c.id: c for c in cats},
+                         "by_name": {c.name.strip().lower(): c for c in cats},
+                         "checked_at": now}
+        else:
+            _snapshot = {**_snapshot, "checked_at": now}
+        return _snapshot
+
+def get_categories():
+    return _refresh()["categories"]
+
+def category_by_id():
+    return _refresh()["by_id"]
+
+def category_by_name():
+    return _refresh()["by_name"]
+
+def category_cache_version():
+    return _refresh()["version"]
+
+# Call inside the transaction that changes categories, then invalidate_categories() after commit.
+def bump_category_version():
+    row = db.session.get(CacheVersion, VERSION_KEY)
+    if row is None:
+        db.session.add(CacheVersion(name=VERSION_KEY, version=1))
+    else:
+        row.version = CacheVersion.version + 1
+
+def invalidate_categories():
+    global _snapshot
+    with _lock:
+        _snapshot = {**_snapshot, "version": None}
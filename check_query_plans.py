@@ -0,0 +1,13 @@
+import os
+import sys
+import pytest
+
+# Kept for existing habits: runs tests/test_query_plans.py, which EXPLAINs every
+# SELECT the main routes issue and fails on full table scans. Set TEST_DATABASE_URL
+# to a scratch PostgreSQL database (it is emptied first) to check production plans.
+def main():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "test_query_plans.py")
+    return pytest.main(["-q", path, *sys.argv[1:]])
+
+if __name__ == "__main__":
+    sys.exit(main())
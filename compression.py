@@ -0,0 +1,91 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+# --- Negotiated Content-Encoding for dynamic responses (COMPRESS_RESPONSES) ---
+# HTML, JSON and CSV responses of at least COMPRESS_MIN_SIZE bytes are sent as br
+# (when the Brotli package is installed) or gzip, whichever the client prefers.
+# Streamed responses (CSV export, print report) are compressed chunk by chunk
+# with a sync flush, so they still arrive progressively. Static files are not
+# touched here: they are served from the precompressed variants (see assets.py).
+
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def negotiate(encodings=None):
+    """Best of encodings (default: all available) acceptable to the client, or None."""
+    return request.accept_encodings.best_match(encodings or available_encodings())
+
+def gzip_bytes(data, level=9):
+    # zlib's gzip header carries no mtime, so prebuilt variants are reproducible
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+def brotli_bytes(data, quality=11):
+    return brotli.compress(data, quality=quality)
+
+def _compressor(encoding, config):
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=config["COMPRESS_BR_QUALITY"])
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(config["COMPRESS_GZIP_LEVEL"], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+def compress_bytes(data, encoding, config):
+    process, _, finish = _compressor(encoding, config)
+    return process(data) + finish()
+
+def compress_chunks(chunks, encoding, config):
+    process, flush, finish = _compressor(encoding, config)
+    for chunk in chunks:
+        data = process(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+def _compressible(response, config):
+    return (response.mimetype in config["COMPRESS_MIMETYPES"]
+            and "Content-Encoding" not in response.headers
+            and not response.direct_passthrough)
+
+def init_compression(app):
+    if not app.config.get("COMPRESS_RESPONSES"):
+        return None
+    config = app.config
+
+    @app.after_request
+    def compress_response(response):
+        if request.method == "HEAD" or not _compressible(response, config):
+            return response
+        response.vary.add("Accept-Encoding")
+        if response.status_code != 200:
+            return response
+        encoding = negotiate()
+        if encoding is None:
+            return response
+        if response.is_streamed:
+            body = response.response
+            response.response = compress_chunks(response.iter_encoded(), encoding, config)
+            if hasattr(body, "close"):
+                response.call_on_close(body.close)  # ends stream_with_context's request context
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < config["COMPRESS_MIN_SIZE"]:
+                return response
+            response.set_data(compress_bytes(data, encoding, config))
+        response.content_encoding = encoding
+        # Same content in another encoding: only weakly equal to the identity ETag, which
+        # is_resource_modified() (conditional_get) still matches on revalidation.
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return compress_response
@@ -14,3 +14,82 @@ class Config:
         SQLALCHEMY_DATABASE_URI = 'sqlite:///expense_tracker.db'
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Importing the app only checks the schema version; pending migrations are applied by
+    # `python migrate.py`, or in place when AUTO_MIGRATE is on (default for SQLite dev databases)
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', '1' if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else '0') == '1'
+
+    # Engine profile: 'tuned' (SQLite pragmas on connect, sized PostgreSQL pool) or 'default'
+    DB_ENGINE_PROFILE = os.environ.get('DB_ENGINE_PROFILE', 'tuned')
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),  # negative = KiB
+    }
+    # Per worker process; gunicorn workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) must fit max_connections
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    if DB_ENGINE_PROFILE == 'tuned' and SQLALCHEMY_DATABASE_URI.startswith('postgresql'):
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+            'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # seconds; below server/proxy idle cutoffs
+            'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            'pool_pre_ping': True,  # drop connections the server closed while idle
+        }
+
+    # Keyset pagination for /expenses, /search and /api/expenses
+    EXPENSES_PAGE_SIZE = int(os.environ.get('EXPENSES_PAGE_SIZE', 50))
+    EXPENSES_MAX_PAGE_SIZE = int(os.environ.get('EXPENSES_MAX_PAGE_SIZE', 500))
+
+    # Rows fetched per keyset batch while streaming CSV exports
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 2000))
+
+    # Ids per set-based statement in bulk edits/deletes (all chunks share one transaction)
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 1000))
+
+    # Rows per batched insert/commit in CSV imports
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 2000))
+
+    # Seconds a worker trusts its cached categories before re-checking the version counter
+    CATEGORY_CACHE_TTL = float(os.environ.get('CATEGORY_CACHE_TTL', 5))
+
+    # Request instrumentation: Server-Timing headers, slow log and Prometheus metrics
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', '0') == '1'
+    SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+    SLOWEST_QUERIES_PER_REQUEST = int(os.environ.get('SLOWEST_QUERIES_PER_REQUEST', 3))
+    METRICS_PATH = os.environ.get('METRICS_PATH', '/metrics')
+
+    # Totals are kept in BASE_CURRENCY using dated rates loaded from FX_RATES_FILE (see fx.py)
+    BASE_CURRENCY = os.environ.get('BASE_CURRENCY', 'INR')
+    FX_RATES_FILE = os.environ.get('FX_RATES_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fx_rates.csv'))
+    FX_CACHE_TTL = float(os.environ.get('FX_CACHE_TTL', 60))
+
+    # Recurring incomes are materialized up to today + RECURRING_HORIZON_DAYS (see recurrence.py)
+    RECURRING_HORIZON_DAYS = int(os.environ.get('RECURRING_HORIZON_DAYS', 0))
+    RECURRING_BATCH_SIZE = int(os.environ.get('RECURRING_BATCH_SIZE', 2000))
+
+    # Percentages of a monthly budget that raise an alert the first time spend reaches them
+    BUDGET_ALERT_THRESHOLDS = tuple(int(t) for t in os.environ.get('BUDGET_ALERT_THRESHOLDS', '50,90,100').split(','))
+
+    # Static files are served under content-hashed names from ASSET_MANIFEST, written by build_assets.py
+    ASSET_FINGERPRINTS = os.environ.get('ASSET_FINGERPRINTS', '1') == '1'
+    ASSET_MANIFEST = os.environ.get('ASSET_MANIFEST', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'dist', 'manifest.json'))
+
+    # Negotiated br/gzip for dynamic responses; turn off when a proxy in front already compresses
+    COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))  # bytes; streamed responses are always compressed
+    COMPRESS_MIMETYPES = ('text/html', 'application/json', 'text/csv', 'text/plain')
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BR_QUALITY = int(os.environ.get('COMPRESS_BR_QUALITY', 4))  # 0-11; higher costs far more CPU per response
+
+    # Upper bound on trend points returned by /api/dashboard
+    DASHBOARD_MAX_POINTS = int(os.environ.get('DASHBOARD_MAX_POINTS', 400))
+
+    # Server-side cache for per-user computed data (dashboard stats), keyed on the
+    # user's data version: 'memory' (in-process LRU), 'none', or 'package.module:factory'
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1024))
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 300))
@@ -0,0 +1,43 @@
+import csv
+import zlib
+from io import StringIO
+from models import Expense
+from pagination import iter_keyset_batches
+
+# --- Streaming CSV export: constant memory regardless of row count ---
+
+CSV_HEADER = ["Date", "Category", "Description", "Amount", "Tags", "Currency"]
+EXPORT_COLUMNS = (Expense.id, Expense.date, Expense.category_id, Expense.description,
+                  Expense.amount, Expense.tags, Expense.currency)
+
+def _drain(buf):
+    data = buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+    return data
+
+def iter_expense_csv(q, categories_dict, batch_size):
+    buf = StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_HEADER)
+    yield _drain(buf)
+    for rows in iter_keyset_batches(q.with_entities(*EXPORT_COLUMNS), Expense, batch_size):
+        for e in rows:
+            cat = categories_dict.get(e.category_id)
+            writer.writerow([
+                e.date.isoformat(),
+                cat.name if cat else "",
+                e.description,
+                e.amount,
+                e.tags,
+                e.currency
+            ])
+        yield _drain(buf)
+
+def gzip_chunks(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from sqlalchemy import func
+from models import Expense, Income
+from rollups import rollup_expense_totals_by_day, rollup_expense_totals_by_category, rollup_income_total_since
+from tags import tag_totals
+
+# --- Dashboard aggregation: a fixed number of SUM/GROUP BY queries per request ---
+
+def _date_range(q_exp, start=None, end=None):
+    if start:
+        q_exp = q_exp.filter(Expense.date >= start)
+    if end:
+        q_exp = q_exp.filter(Expense.date <= end)
+    return q_exp
+
+def expense_totals_by_category(q_exp, start=None, end=None):
+    rows = (_date_range(q_exp, start, end).with_entities(Expense.category_id, func.sum(Expense.base_amount))
+            .group_by(Expense.category_id).all())
+    return {cat_id: total or 0 for cat_id, total in rows}
+
+def expense_totals_by_day(q_exp, start, end=None):
+    rows = (_date_range(q_exp, start, end).with_entities(Expense.date, func.sum(Expense.base_amount))
+            .group_by(Expense.date).all())
+    return {day: total or 0 for day, total in rows}
+
+def income_total_since(q_inc, start):
+    return q_inc.filter(Income.date >= start).with_entities(func.sum(Income.base_amount)).scalar() or 0
+
+# Logged-in users read the rollup tables (O(days)); guests aggregate their few raw rows.
+def dashboard_stats(q_exp, q_inc, categories, today, user_id=None):
+    start_month = today.replace(day=1)
+    start_week = today - timedelta(days=today.weekday())
+    if user_id is not None:
+        by_day = rollup_expense_totals_by_day(user_id, min(start_month, start_week))
+        by_cat = rollup_expense_totals_by_category(user_id)
+        total_income = rollup_income_total_since(user_id, start_month)
+    else:
+        by_day = expense_totals_by_day(q_exp, min(start_month, start_week))
+        by_cat = expense_totals_by_category(q_exp)
+        total_income = income_total_since(q_inc, start_month)
+
+    total_month = sum(amt for day, amt in by_day.items() if day >= start_month)
+    total_week = sum(amt for day, amt in by_day.items() if day >= start_week)
+    total_today = by_day.get(today, 0)
+
+    cat_totals = {cat.name: by_cat.get(cat.id, 0) for cat in categories}
+    max_cat_name = max(cat_totals, key=lambda k: cat_totals[k]) if cat_totals else ""
+    category_chart_data = [
+        {'name': cat.name, 'icon': cat.icon, 'color': cat.color, 'total': float(by_cat[cat.id])}
+        for cat in categories if by_cat.get(cat.id, 0) > 0
+    ]
+
+    trend_labels, trend_data = [], []
+    day = start_month
+    while day <= today:
+        trend_labels.append(day.strftime('%Y-%m-%d'))
+        trend_data.append(by_day.get(day, 0))
+        day += timedelta(days=1)
+
+    return {
+        "today": total_today,
+        "week": total_week,
+        "month": total_month,
+        "income": total_income,
+        "max_cat_name": max_cat_name,
+        "max_cat_amt": cat_totals.get(max_cat_name, 0),
+        "cat_totals": cat_totals,
+        "category_chart_data": category_chart_data,
+        "trend_labels": trend_labels,
+        "trend_data": trend_data,
+        "tag_totals": tag_totals(q_exp, start_month),
+    }
+
+# --- Dashboard series for /api/dashboard: trend buckets and category split over a range ---
+
+GRANULARITIES = ("day", "week", "month")
+
+def bucket_start(day, granularity):
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+def _next_bucket(day, granularity):
+    if granularity == "week":
+        return day + timedelta(days=7)
+    if granularity == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+def dashboard_series(q_exp, categories, start, end, granularity="day", user_id=None):
+    if user_id is not None:
+        by_day = rollup_expense_totals_by_day(user_id, start, end)
+        by_cat = rollup_expense_totals_by_category(user_id, start, end)
+    else:
+        by_day = expense_totals_by_day(q_exp, start, end)
+        by_cat = expense_totals_by_category(q_exp, start, end)
+    buckets = {}
+    for day, amount in by_day.items():
+        key = bucket_start(day, granularity)
+        buckets[key] = buckets.get(key, 0) + amount
+    labels, data = [], []
+    key = bucket_start(start, granularity)
+    while key <= end:
+        labels.append(key.isoformat())
+        data.append(round(buckets.get(key, 0), 2))
+        key = _next_bucket(key, granularity)
+    return {
+        "trend": {"labels": labels, "data": data},
+        "categories": [
+            {"id": cat.id, "name": cat.name, "icon": cat.icon, "color": cat.color, "total": round(by_cat[cat.id], 2)}
+            for cat in categories if by_cat.get(cat.id, 0) > 0
+        ],
+    }
@@ -0,0 +1,25 @@
+from sqlalchemy import event
+
+# --- Engine profiles (DB_ENGINE_PROFILE) ---
+# 'tuned': on SQLite every new connection gets SQLITE_PRAGMAS (WAL, so readers no
+# longer block the writer, plus a busy timeout instead of instant "database is
+# locked"); on PostgreSQL the pool settings come from SQLALCHEMY_ENGINE_OPTIONS
+# (see config.py). 'default' leaves the driver defaults, for comparison.
+
+def init_engine_tuning(app, db):
+    if app.config.get("DB_ENGINE_PROFILE") != "tuned":
+        return None
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return None
+    pragmas = app.config["SQLITE_PRAGMAS"]
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    return pragmas
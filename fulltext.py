@@ -0,0 +1,155 @@
+import re
+from flask import current_app
+from sqlalchemy import Float, Integer, and_, func, literal, literal_column, or_, select, text
+from sqlalchemy.exc import OperationalError
+from models import db
+
+# --- Full-text search over expense descriptions/tags and income sources/tags ---
+# SQLite: contentless FTS5 tables kept in sync by triggers, with an "owner" token
+# column (u<user_id> / g<guest_key>) so a query only intersects the caller's postings.
+# PostgreSQL: generated tsvector columns with GIN indexes. Anything else: LIKE.
+
+MAX_TERMS = 8
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# table: (searchable text columns, bm25 weights for them)
+INDEXED = {
+    "expense": (("description", "tags"), (2.0, 1.0)),
+    "income": (("source", "tags"), (2.0, 1.0)),
+}
+
+_OWNER_SQL = "CASE WHEN {r}.user_id IS NOT NULL THEN 'u' || {r}.user_id ELSE 'g' || coalesce({r}.guest_key, '') END"
+
+def _sqlite_ddl(table, columns):
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in columns)
+    old_vals = ", ".join(f"old.{c}" for c in columns)
+    insert = f"INSERT INTO {fts}(rowid, owner, {cols}) VALUES (new.id, {_OWNER_SQL.format(r='new')}, {new_vals});"
+    delete = (f"INSERT INTO {fts}({fts}, rowid, owner, {cols}) "
+              f"VALUES ('delete', old.id, {_OWNER_SQL.format(r='old')}, {old_vals});")
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(owner, {cols}, content='', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols}, user_id, guest_key ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+def _sqlite_fill(conn, table, columns):
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('delete-all')")
+    conn.exec_driver_sql(f"INSERT INTO {fts}(rowid, owner, {cols}) "
+                         f"SELECT id, {_OWNER_SQL.format(r=table)}, {cols} FROM {table}")
+
+def _pg_vector_sql(columns):
+    parts = " || ' ' || ".join(f"replace(coalesce({c}, ''), ',', ' ')" for c in columns)
+    return f"to_tsvector('simple', {parts})"
+
+def install_fulltext():
+    """Create the full-text structures if missing (a migration step); returns the backend installed."""
+    engine = db.engine
+    if engine.dialect.name == "sqlite":
+        try:
+            with engine.begin() as conn:
+                for table, (columns, _) in INDEXED.items():
+                    exists = conn.exec_driver_sql(
+                        "SELECT 1 FROM sqlite_master WHERE name = ?", (f"{table}_fts",)).first()
+                    for statement in _sqlite_ddl(table, columns):
+                        conn.exec_driver_sql(statement)
+                    if not exists:
+                        _sqlite_fill(conn, table, columns)
+            return "fts5"
+        except OperationalError:
+            return "like"  # SQLite built without FTS5
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for table, (columns, _) in INDEXED.items():
+                conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                                     f"GENERATED ALWAYS AS ({_pg_vector_sql(columns)}) STORED")
+                conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector "
+                                     f"ON {table} USING GIN (search_vector)")
+        return "tsvector"
+    return "like"
+
+def detect_fulltext(app):
+    """Pick the backend at startup from what the migrations installed; no DDL."""
+    engine = db.engine
+    backend = "like"
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            if conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'expense_fts'").first():
+                backend = "fts5"
+    elif engine.dialect.name == "postgresql":
+        backend = "tsvector"
+    app.extensions["fulltext"] = backend
+    return backend
+
+def drop_fulltext():
+    # The SQLite triggers go with their base tables; the FTS tables do not.
+    if db.engine.dialect.name == "sqlite":
+        with db.engine.begin() as conn:
+            for table in INDEXED:
+                conn.exec_driver_sql(f"DROP TABLE IF EXISTS {table}_fts")
+
+def rebuild_fulltext():
+    if current_app.extensions.get("fulltext") != "fts5":
+        return False  # generated columns and LIKE need no rebuild
+    with db.engine.begin() as conn:
+        for table, (columns, _) in INDEXED.items():
+            _sqlite_fill(conn, table, columns)
+    return True
+
+def search_terms(raw):
+    return [t.lower() for t in TERM_RE.findall(raw or "")][:MAX_TERMS]
+
+def owner_token(user_id=None, guest_key=None):
+    return f"u{user_id}" if user_id is not None else f"g{guest_key or ''}"
+
+def _matches(model, owner, terms):
+    """Subquery of (id, rank) for rows matching every term as a prefix; lower rank is better."""
+    table = model.__tablename__
+    columns, weights = INDEXED[table]
+    backend = current_app.extensions.get("fulltext", "like")
+    if backend == "fts5":
+        body = " AND ".join(f'"{t}"*' for t in terms)
+        match = f'owner : "{owner}" AND {{{" ".join(columns)}}} : ({body})'
+        bm25_weights = ", ".join(str(w) for w in (0.0, *weights))
+        return (text(f"SELECT rowid AS id, bm25({table}_fts, {bm25_weights}) AS rank "
+                     f"FROM {table}_fts WHERE {table}_fts MATCH :match")
+                .bindparams(match=match).columns(id=Integer, rank=Float).subquery(f"{table}_matches"))
+    if backend == "tsvector":
+        vector = literal_column(f"{table}.search_vector")
+        query = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in terms))
+        return (select(model.id.label("id"), (-func.ts_rank(vector, query)).label("rank"))
+                .where(vector.op("@@")(query)).subquery(f"{table}_matches"))
+    text_columns = [getattr(model, c) for c in columns]
+    return (select(model.id.label("id"), literal(0.0).label("rank"))
+            .where(and_(*(or_(*(c.ilike(f"%{t}%") for c in text_columns)) for t in terms)))
+            .subquery(f"{table}_matches"))
+
+def ranked_search(q, model, owner, raw):
+    """q restricted to rows matching raw, best matches first; None if raw has no terms."""
+    terms = search_terms(raw)
+    if not terms:
+        return None
+    matches = _matches(model, owner, terms)
+    return (q.join(matches, matches.c.id == model.id)
+            .order_by(matches.c.rank, model.date.desc(), model.id.desc()))
+
+def match_filter(q, model, owner, raw):
+    """q restricted to rows matching raw, keeping its own ordering (for exports)."""
+    terms = search_terms(raw)
+    if not terms:
+        return q
+    matches = _matches(model, owner, terms)
+    return q.filter(model.id.in_(select(matches.c.id)))
+
+def offset_page(q, cursor, page_size):
+    # Ranked results have no stable keyset; their cursor is a plain row offset.
+    offset = int(cursor) if cursor and cursor.isdigit() else 0
+    rows = q.offset(offset).limit(page_size + 1).all()
+    next_cursor = str(offset + page_size) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
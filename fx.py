@@ -0,0 +1,133 @@
+import bisect
+import csv
+import os
+import threading
+import time
+from datetime import date
+from flask import current_app
+from sqlalchemy import Numeric, and_, cast, func, select
+from models import db, Expense, Income, FxRate, CacheVersion
+from rollups import dialect_insert
+
+# --- Base-currency normalization from a local, dated FX rate table ---
+# Writes store base_amount = amount * rate(currency, date) so every aggregate is a
+# plain SUM(base_amount). The rate for a day is the latest one on or before it,
+# else the earliest one after it. Rates are cached per worker like categories:
+# an immutable snapshot re-checked against the "fx" version counter every FX_CACHE_TTL.
+
+VERSION_KEY = "fx"
+
+_lock = threading.Lock()
+_snapshot = {"version": None, "rates": {}, "checked_at": 0.0}
+
+def _db_version():
+    row = db.session.get(CacheVersion, VERSION_KEY)
+    return row.version if row else 0
+
+def _rates():
+    global _snapshot
+    snap = _snapshot
+    now = time.monotonic()
+    if snap["version"] is not None and now - snap["checked_at"] < current_app.config["FX_CACHE_TTL"]:
+        return snap["rates"]
+    with _lock:
+        version = _db_version()
+        if version != _snapshot["version"]:
+            rates = {}
+            for r in FxRate.query.order_by(FxRate.currency, FxRate.day):
+                days, values = rates.setdefault(r.currency, ([], []))
+                days.append(r.day)
+                values.append(r.rate)
+            _snapshot = {"version": version, "rates": rates, "checked_at": now}
+        else:
+            _snapshot = {**_snapshot, "checked_at": now}
+        return _snapshot["rates"]
+
+def rate_for(currency, day):
+    currency = (currency or current_app.config["BASE_CURRENCY"]).upper()
+    if currency == current_app.config["BASE_CURRENCY"]:
+        return 1.0
+    series = _rates().get(currency)
+    if not series:
+        raise ValueError(f"no FX rate for {currency}")
+    days, values = series
+    i = bisect.bisect_right(days, day)
+    return values[i - 1] if i else values[0]
+
+def to_base(amount, currency, day):
+    return round(amount * rate_for(currency, day), 2)
+
+def normalize(row):
+    """Set base_amount on an Expense/Income; raises ValueError for unknown currencies."""
+    row.base_amount = to_base(row.amount, row.currency, row.date)
+    return row
+
+def invalidate_fx():
+    global _snapshot
+    with _lock:
+        _snapshot = {**_snapshot, "version": None}
+
+# --- Loading rates and bulk re-normalization ---
+
+def read_rates_file(path):
+    # CSV with header: date,currency,rate  (rate = BASE_CURRENCY per 1 unit of currency)
+    with open(path, newline="", encoding="utf-8") as f:
+        for line in csv.DictReader(f):
+            yield {"day": date.fromisoformat(line["date"].strip()),
+                   "currency": line["currency"].strip().upper(),
+                   "rate": float(line["rate"])}
+
+def load_rates(path):
+    rows = list(read_rates_file(path))
+    if not rows:
+        return 0
+    insert = dialect_insert()
+    if insert is not None:
+        stmt = insert(FxRate)
+        db.session.execute(stmt.on_conflict_do_update(index_elements=["currency", "day"],
+                                                      set_={"rate": stmt.excluded.rate}), rows)
+    else:
+        for values in rows:
+            db.session.merge(FxRate(**values))
+    row = db.session.get(CacheVersion, VERSION_KEY)
+    if row is None:
+        db.session.add(CacheVersion(name=VERSION_KEY, version=1))
+    else:
+        row.version = CacheVersion.version + 1
+    db.session.commit()
+    invalidate_fx()
+    return len(rows)
+
+def load_rates_if_empty(app):
+    path = app.config["FX_RATES_FILE"]
+    if db.session.query(FxRate.currency).first() is None and path and os.path.exists(path):
+        load_rates(path)
+
+def _rate_sql(model):
+    def nearest(before):
+        cond = FxRate.day <= model.date if before else FxRate.day > model.date
+        order = FxRate.day.desc() if before else FxRate.day.asc()
+        return (select(FxRate.rate).where(and_(FxRate.currency == model.currency, cond))
+                .order_by(order).limit(1).scalar_subquery())
+    return func.coalesce(nearest(True), nearest(False))
+
+def rebase(q, model):
+    """Recompute base_amount in SQL for the rows q selects (after amount, currency or date changed)."""
+    base = current_app.config["BASE_CURRENCY"]
+    q.filter(func.coalesce(func.upper(model.currency), base) == base) \
+        .update({"base_amount": model.amount}, synchronize_session=False)
+    q.filter(func.coalesce(func.upper(model.currency), base) != base) \
+        .update({"base_amount": func.round(cast(model.amount * _rate_sql(model), Numeric), 2)},
+                synchronize_session=False)  # PostgreSQL only has round(numeric, int)
+
+def renormalize(only_missing=False):
+    """Recompute base_amount in SQL for every row (or rows still NULL); returns rows left unconverted."""
+    unconverted = 0
+    for model in (Expense, Income):
+        q = model.query
+        if only_missing:
+            q = q.filter(model.base_amount.is_(None))
+        rebase(q, model)
+        unconverted += model.query.filter(model.base_amount.is_(None)).count()
+    db.session.commit()
+    return unconverted
@@ -0,0 +1,11 @@
+import os
+
+# The app is imported once in the master (its schema check runs once) and workers
+# fork from it; each worker must open its own database connections.
+preload_app = True
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+
+def post_fork(server, worker):
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)  # leave the master's sockets alone, just forget them
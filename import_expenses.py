@@ -0,0 +1,26 @@
+import sys
+from app import app
+from models import User
+from importer import import_expenses_csv, decode_lines
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python import_expenses.py <username> <file.csv>")
+        sys.exit(2)
+    username, path = sys.argv[1], sys.argv[2]
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+        if not user:
+            print(f"❌ No user named {username!r}")
+            sys.exit(1)
+        with open(path, "rb") as f:
+            result = import_expenses_csv(decode_lines(f), user.id, app.config["IMPORT_BATCH_SIZE"])
+        print(f"✅ Imported {result['inserted']} expenses, skipped {result['duplicates']} duplicates, "
+              f"{result['error_count']} rows with errors")
+        if result["fatal"]:
+            print(f"❌ {result['fatal']}")
+        for line, msg in result["errors"]:
+            print(f"  line {line}: {msg}")
+
+if __name__ == "__main__":
+    main()
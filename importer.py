@@ -0,0 +1,135 @@
+import csv
+import hashlib
+from collections import Counter, defaultdict
+from datetime import date
+from models import db, Expense
+from csv_export import CSV_HEADER
+from rollups import add_expense_deltas
+from category_cache import category_by_name, get_categories
+from suggestions import record_descriptions
+from response_cache import bump_user_data_version
+from tags import normalize_tags, add_expense_tags
+from fx import to_base
+from budgets import check_budgets
+
+# --- Bulk CSV import (same format as export_expenses) ---
+# Every row gets an import_key derived from its content and its occurrence
+# number within the file, so re-importing a statement skips rows already loaded.
+# Bad rows are reported and skipped; input that is not UTF-8 ends the import at
+# that line (rows before it are kept) with result["fatal"] explaining why.
+
+MAX_REPORTED_ERRORS = 100
+
+def decode_lines(binary_lines):
+    # Decoding line by line (not in TextIOWrapper's 8 KB blocks) keeps every row before a bad byte.
+    for n, raw in enumerate(binary_lines):
+        yield raw.decode("utf-8-sig" if n == 0 else "utf-8")
+
+def _error(result, line, message):
+    result["error_count"] += 1
+    if len(result["errors"]) < MAX_REPORTED_ERRORS:
+        result["errors"].append((line, message))
+
+def _rows(reader, result):
+    while True:
+        try:
+            yield next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            _error(result, reader.line_num, f"malformed CSV: {e}")
+        except UnicodeDecodeError as e:
+            result["fatal"] = (f"The file is not UTF-8 text (byte 0x{e.object[e.start]:02x}); save it as "
+                               f"CSV UTF-8 and import it again. Rows from line {reader.line_num + 1} on were not read.")
+            _error(result, reader.line_num + 1, "not UTF-8 text")
+            return
+
+def parse_row(row, categories):
+    if len(row) != len(CSV_HEADER):
+        raise ValueError(f"expected {len(CSV_HEADER)} columns, got {len(row)}")
+    date_str, cat_name, description, amount_str, tags, currency = (v.strip() for v in row)
+    expense_date = date.fromisoformat(date_str)
+    amount = float(amount_str)
+    if not amount > 0 or amount == float("inf"):
+        raise ValueError(f"invalid amount {amount_str!r}")
+    if not description or len(description) > 100:
+        raise ValueError("description must be 1-100 characters")
+    if len(tags) > 120:
+        raise ValueError("tags must be at most 120 characters")
+    currency = (currency or "INR").upper()
+    if len(currency) > 8:
+        raise ValueError(f"invalid currency {currency!r}")
+    base_amount = to_base(amount, currency, expense_date)
+    category_id = None
+    if cat_name:
+        cat = categories.get(cat_name.lower())
+        if cat is None:
+            raise ValueError(f"unknown category {cat_name!r}")
+        category_id = cat.id
+    return {"date": expense_date, "category_id": category_id, "description": description,
+            "amount": amount, "tags": tags, "currency": currency, "base_amount": base_amount}
+
+def row_key(values, occurrence):
+    raw = "|".join(str(values[k]) for k in ("date", "category_id", "description", "amount", "tags", "currency"))
+    return hashlib.sha1(f"{raw}|{occurrence}".encode("utf-8")).hexdigest()
+
+def _flush(batch, user_id, result):
+    keys = [row["import_key"] for row in batch]
+    existing = {k for (k,) in db.session.query(Expense.import_key)
+                .filter(Expense.user_id == user_id, Expense.import_key.in_(keys))}
+    new_rows = [row for row in batch if row["import_key"] not in existing]
+    result["duplicates"] += len(batch) - len(new_rows)
+    if new_rows:
+        for row in new_rows:
+            row["tags"] = normalize_tags(row["tags"])
+        db.session.execute(Expense.__table__.insert(), new_rows)
+        tags_by_key = {row["import_key"]: row["tags"] for row in new_rows if row["tags"]}
+        if tags_by_key:
+            inserted = db.session.query(Expense.id, Expense.import_key).filter(
+                Expense.user_id == user_id, Expense.import_key.in_(tags_by_key))
+            add_expense_tags((expense_id, user_id, tags_by_key[key]) for expense_id, key in inserted)
+        deltas = defaultdict(lambda: [0, 0])
+        for row in new_rows:
+            delta = deltas[(row["date"], row["category_id"])]
+            delta[0] += row["base_amount"]
+            delta[1] += 1
+        add_expense_deltas(user_id, deltas)
+        record_descriptions(user_id, ((row["description"], row["date"], 1) for row in new_rows))
+        result["budget_alerts"] += check_budgets(user_id, {(row["date"].year, row["date"].month) for row in new_rows},
+                                                 get_categories())
+        bump_user_data_version(user_id)
+    db.session.commit()
+    result["inserted"] += len(new_rows)
+
+def import_expenses_csv(lines, user_id, batch_size=2000):
+    result = {"inserted": 0, "duplicates": 0, "error_count": 0, "errors": [], "budget_alerts": [], "fatal": None}
+    reader = csv.reader(lines)
+    rows = _rows(reader, result)
+    header = next(rows, None)
+    if result["error_count"]:
+        return result
+    if not header or [h.strip().lower() for h in header] != [h.lower() for h in CSV_HEADER]:
+        _error(result, 1, "header must be: " + ",".join(CSV_HEADER))
+        return result
+    categories = category_by_name()
+    occurrences = Counter()
+    batch = []
+    for values in rows:
+        if not any(v.strip() for v in values):
+            continue
+        try:
+            row = parse_row(values, categories)
+        except ValueError as e:
+            _error(result, reader.line_num, str(e))
+            continue
+        base_key = row_key(row, 0)
+        occurrences[base_key] += 1
+        row["import_key"] = row_key(row, occurrences[base_key])
+        row["user_id"] = user_id
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _flush(batch, user_id, result)
+            batch = []
+    if batch:
+        _flush(batch, user_id, result)
+    return result
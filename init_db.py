@@ -1,30 +1,19 @@
-from app import app, db
-from models import Category
+import sys
+from models import db
+from fulltext import drop_fulltext
+from migrations import migration_app, migrate
 
-def init_database():
+# Development helper: `python init_db.py --reset` drops every table and rebuilds the
+# schema through the migrations. Deploys run migrate.py, which never drops data.
+def init_database(reset=False):
+    app = migration_app()
     with app.app_context():
-        db.drop_all()      # This will drop ALL tables
-        db.engine.execute('DROP TABLE IF EXISTS "user" CASCADE;')
-        db.create_all()    # This will re-create them based on your models!
-        print("✅ Database tables re-created!")
-
-        default_categories = [
-            {"name": "Food", "color": "#FFB347", "icon": "🍔"},
-            {"name": "Transport", "color": "#B0E0E6", "icon": "🚌"},
-            {"name": "Entertainment", "color": "#FFD700", "icon": "🎮"},
-            {"name": "Health", "color": "#98FB98", "icon": "💊"},
-            {"name": "Utilities", "color": "#87CEEB", "icon": "💡"},
-            {"name": "Shopping", "color": "#FF69B4", "icon": "🛒"},
-            {"name": "Other", "color": "#CCCCCC", "icon": "🔖"},
-        ]
-
-        for cat_data in default_categories:
-            if not Category.query.filter_by(name=cat_data["name"]).first():
-                category = Category(**cat_data)
-                db.session.add(category)
-
-        db.session.commit()
-        print("✅ Default categories created!")
+        if reset:
+            db.drop_all()
+            drop_fulltext()
+            print("✅ Database tables dropped")
+        migrate(log=print)
+        print("✅ Database ready")
 
 if __name__ == "__main__":
-    init_database()
+    init_database(reset="--reset" in sys.argv[1:])
@@ -0,0 +1,154 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from flask import g, request, Response, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+
+# --- Opt-in request instrumentation (INSTRUMENTATION_ENABLED) ---
+# Per request: SQL query count and time, template render time and the slowest
+# statements, exposed as Server-Timing headers and a structured slow log. Streamed
+# responses are measured to their last byte in the metrics and the slow log, but
+# their headers can only report up to the first byte.
+# Per process: Prometheus-style latency histograms per route at METRICS_PATH.
+
+logger = logging.getLogger("expense_tracker.perf")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class RouteMetrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.histograms = defaultdict(lambda: {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+        self.queries = defaultdict(int)
+        self.db_seconds = defaultdict(float)
+
+    def observe(self, route, method, status, seconds, queries, db_seconds):
+        with self.lock:
+            h = self.histograms[(route, method, str(status))]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    h["buckets"][i] += 1
+            h["sum"] += seconds
+            h["count"] += 1
+            self.queries[route] += queries
+            self.db_seconds[route] += db_seconds
+
+    def render(self):
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self.lock:
+            for (route, method, status), h in sorted(self.histograms.items()):
+                labels = f'route="{route}",method="{method}",status="{status}"'
+                for bound, count in zip(self.buckets, h["buckets"]):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {h["count"]}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {h['sum']:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {h['count']}")
+            lines += ["# HELP db_queries_total SQL statements executed, by route.", "# TYPE db_queries_total counter"]
+            lines += [f'db_queries_total{{route="{r}"}} {n}' for r, n in sorted(self.queries.items())]
+            lines += ["# HELP db_query_seconds_total Time spent in SQL, by route.", "# TYPE db_query_seconds_total counter"]
+            lines += [f'db_query_seconds_total{{route="{r}"}} {s:.6f}' for r, s in sorted(self.db_seconds.items())]
+        return "\n".join(lines) + "\n"
+
+def _compact(statement, limit=500):
+    return " ".join(statement.split())[:limit]
+
+def _perf():
+    return g.get("perf") if has_request_context() else None
+
+def init_instrumentation(app, db):
+    if not app.config.get("INSTRUMENTATION_ENABLED"):
+        return None
+    metrics = RouteMetrics()
+    slow_query_s = app.config["SLOW_QUERY_MS"] / 1000.0
+    slow_request_s = app.config["SLOW_REQUEST_MS"] / 1000.0
+    keep_slowest = app.config["SLOWEST_QUERIES_PER_REQUEST"]
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("perf_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["perf_query_start"].pop()
+        perf = _perf()
+        if perf is None:
+            return
+        perf["queries"] += 1
+        perf["db"] += elapsed
+        slowest = perf["slowest"]
+        if len(slowest) < keep_slowest or elapsed > slowest[-1][0]:
+            slowest.append((elapsed, statement))
+            slowest.sort(key=lambda item: item[0], reverse=True)
+            del slowest[keep_slowest:]
+        if elapsed >= slow_query_s:
+            logger.warning(json.dumps({"event": "slow_query", "route": request.endpoint,
+                                       "ms": round(elapsed * 1000, 2), "statement": _compact(statement)}))
+
+    def _render_started(sender, template, context, **extra):
+        perf = _perf()
+        if perf is not None:
+            perf["render_start"].append(time.perf_counter())
+
+    def _render_finished(sender, template, context, **extra):
+        perf = _perf()
+        if perf is not None and perf["render_start"]:
+            perf["render"] += time.perf_counter() - perf["render_start"].pop()
+
+    before_render_template.connect(_render_started, app, weak=False)
+    template_rendered.connect(_render_finished, app, weak=False)
+
+    @app.before_request
+    def _start_request_timer():
+        g.perf = {"start": time.perf_counter(), "queries": 0, "db": 0.0,
+                  "render": 0.0, "render_start": [], "slowest": []}
+
+    def _finish(perf, route, method, path, status):
+        total = time.perf_counter() - perf["start"]
+        metrics.observe(route, method, status, total, perf["queries"], perf["db"])
+        if total >= slow_request_s:
+            logger.warning(json.dumps({
+                "event": "slow_request", "route": route, "method": method, "path": path,
+                "status": status, "ms": round(total * 1000, 2),
+                "queries": perf["queries"], "db_ms": round(perf["db"] * 1000, 2),
+                "render_ms": round(perf["render"] * 1000, 2),
+                "slowest": [{"ms": round(s * 1000, 2), "statement": _compact(stmt)} for s, stmt in perf["slowest"]],
+            }))
+
+    @app.after_request
+    def _record_request(response):
+        perf = g.get("perf")
+        if perf is None:
+            return response
+        total = time.perf_counter() - perf["start"]
+        route = request.endpoint or "unmatched"
+        # Headers leave before a streamed body (export_expenses, print_report) is produced,
+        # so for those Server-Timing and X-Query-Count only cover the time to the first byte.
+        response.headers["Server-Timing"] = ", ".join([
+            f'db;dur={perf["db"] * 1000:.2f};desc="{perf["queries"]} queries"',
+            f'render;dur={perf["render"] * 1000:.2f}',
+            f'app;dur={total * 1000:.2f}',
+        ])
+        response.headers["X-Query-Count"] = str(perf["queries"])
+        args = (perf, route, request.method, request.path, response.status_code)
+        if response.is_streamed:
+            # The body's queries still land in perf (stream_with_context keeps g); the
+            # histogram and slow log are written once the server has sent all of it.
+            response.call_on_close(lambda: _finish(*args))
+        else:
+            _finish(*args)
+        return response
+
+    @app.route(app.config["METRICS_PATH"])
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    return metrics
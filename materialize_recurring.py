@@ -0,0 +1,20 @@
+import sys
+from datetime import date
+from app import app
+from models import Income
+from recurrence import materialize, start_series, horizon
+
+# Materializes every due recurring-income occurrence for all users and guests, up
+# to the horizon (today + RECURRING_HORIZON_DAYS, or the date given). Safe to run
+# from cron alongside the web workers: each series resumes from its watermark.
+def main():
+    with app.app_context():
+        until = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else horizon()
+        started = start_series()
+        if started:
+            print(f"✅ Watermarks set on {started} recurring incomes")
+        inserted = materialize(Income.query, until, app.config["RECURRING_BATCH_SIZE"])
+        print(f"✅ Materialized {inserted} recurring income occurrences up to {until}")
+
+if __name__ == "__main__":
+    main()
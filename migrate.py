@@ -0,0 +1,25 @@
+import argparse
+from migrations import migration_app, migrate, schema_version, MIGRATIONS, LATEST
+from models import db
+
+# Pre-start step (see Procfile): applies pending schema migrations once, so web
+# workers boot with a version check only. Safe to re-run; never drops data.
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    parser.add_argument("--status", action="store_true", help="list migrations and exit")
+    args = parser.parse_args()
+    app = migration_app()
+    with app.app_context():
+        if args.status:
+            current = schema_version()
+            for version, name, _ in MIGRATIONS:
+                print(f"{'✅' if version <= current else '⏳'} {version:04d} {name}")
+            return
+        applied = migrate(args.target, log=print)
+        print(f"✅ Database schema at version {schema_version()} (latest {LATEST}), "
+              f"{len(applied)} migration(s) applied")
+        db.engine.dispose()
+
+if __name__ == "__main__":
+    main()
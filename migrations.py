@@ -0,0 +1,167 @@
+import contextlib
+import logging
+from datetime import datetime
+from flask import Flask, current_app
+from sqlalchemy import func, inspect
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from config import Config
+from models import db, Category, Expense, Income, SchemaMigration, CategoryMonthlyRollup
+from engine_tuning import init_engine_tuning
+from category_cache import bump_category_version
+from fulltext import install_fulltext, detect_fulltext
+from fx import load_rates_if_empty, renormalize
+from rollups import rebuild_rollups
+from recurrence import start_series
+from tags import rebuild_tags
+from suggestions import rebuild_suggestions
+from response_cache import bump_all_data_versions
+
+# --- Versioned schema migrations ---
+# `python migrate.py` applies pending steps once, before the web workers start;
+# importing app.py only compares the recorded version with LATEST (one query, no
+# DDL). Steps never drop data. The baseline builds the *current* models, so later
+# steps must tolerate objects that already exist (use add_column / create_index).
+
+logger = logging.getLogger("expense_tracker.migrations")
+
+MIGRATIONS = []
+
+def migration(version, name):
+    def register(step):
+        MIGRATIONS.append((version, name, step))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return step
+    return register
+
+def add_missing_columns():
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                add_column(table.name, column.name)
+
+def add_column(table_name, column_name):
+    column = db.metadata.tables[table_name].columns[column_name]
+    if column_name in {c["name"] for c in inspect(db.engine).get_columns(table_name)}:
+        return
+    col_type = column.type.compile(dialect=db.engine.dialect)
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql(f'ALTER TABLE "{table_name}" ADD COLUMN "{column_name}" {col_type}')
+
+def create_index(table_name, index_name):
+    index = next(i for i in db.metadata.tables[table_name].indexes if i.name == index_name)
+    index.create(db.engine, checkfirst=True)
+
+@migration(1, "baseline schema")
+def baseline():
+    # Databases created before migrations existed get their missing columns and indexes here.
+    db.create_all()
+    add_missing_columns()
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+@migration(2, "full-text search")
+def fulltext():
+    install_fulltext()
+
+@migration(3, "default categories")
+def default_categories():
+    if Category.query.count():
+        return
+    for name, color, icon in [("Food", "#FFB347", "🍔"), ("Transport", "#B0E0E6", "🚌"),
+                              ("Entertainment", "#FFD700", "🎮"), ("Health", "#98FB98", "💊"),
+                              ("Utilities", "#87CEEB", "💡"), ("Shopping", "#FF69B4", "🛒"),
+                              ("Other", "#CCCCCC", "🔖")]:
+        db.session.add(Category(name=name, color=color, icon=icon))
+    bump_category_version()
+    db.session.commit()
+
+@migration(4, "FX rates and base-currency amounts")
+def base_amounts():
+    load_rates_if_empty(current_app)
+    if any(m.query.filter(m.base_amount.is_(None)).first() for m in (Expense, Income)):
+        renormalize(only_missing=True)
+        rebuild_rollups()
+        bump_all_data_versions()
+        db.session.commit()
+
+@migration(5, "recurring income watermarks")
+def recurring_watermarks():
+    start_series()
+
+@migration(6, "category budgets and monthly category counters")
+def category_budgets():
+    db.create_all()  # category_monthly_rollup, category_budget, budget_alert
+    if CategoryMonthlyRollup.query.first() is None:
+        rebuild_rollups()  # backfills the per-category counters from the expenses
+
+@migration(7, "tag links and description suggestions")
+def tags_and_suggestions():
+    # expense_tag and description_suggestion only follow writes; backfill them for
+    # existing expenses (normalizing legacy tag strings) like rebuild_rollups.py does.
+    rebuild_tags()
+    rebuild_suggestions()
+    bump_all_data_versions()
+    db.session.commit()
+
+LATEST = MIGRATIONS[-1][0]
+
+def schema_version():
+    try:
+        return db.session.query(func.max(SchemaMigration.version)).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return 0  # no schema_migration table yet
+
+@contextlib.contextmanager
+def _migration_lock():
+    # Serializes concurrent migrate runs on PostgreSQL (e.g. two release phases).
+    if db.engine.dialect.name != "postgresql":
+        yield
+        return
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql("SELECT pg_advisory_lock(48151623)")
+        try:
+            yield
+        finally:
+            conn.exec_driver_sql("SELECT pg_advisory_unlock(48151623)")
+
+def migrate(target=None, log=logger.info):
+    """Apply pending migrations up to target (default: all); returns the versions applied."""
+    applied_now = []
+    with _migration_lock():
+        SchemaMigration.__table__.create(db.engine, checkfirst=True)
+        applied = {v for (v,) in db.session.query(SchemaMigration.version)}
+        for version, name, step in MIGRATIONS:
+            if version in applied or (target is not None and version > target):
+                continue
+            step()
+            db.session.add(SchemaMigration(version=version, name=name, applied_at=datetime.now()))
+            db.session.commit()
+            applied_now.append(version)
+            log(f"✅ Migration {version:04d} {name}")
+    return applied_now
+
+def check_schema(app):
+    """Import-time check: migrate in place only if AUTO_MIGRATE, otherwise refuse to start behind."""
+    current = schema_version()
+    if current < LATEST:
+        if not app.config["AUTO_MIGRATE"]:
+            raise RuntimeError(f"Database schema is at version {current}, this code needs {LATEST}: "
+                               "run `python migrate.py` first")
+        migrate()
+    elif current > LATEST:
+        logger.warning("Database schema version %s is newer than this code (%s)", current, LATEST)
+    detect_fulltext(app)
+
+def migration_app():
+    """Bare app for migrate.py/init_db.py: config and database only, no routes or import-time checks."""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db.init_app(app)
+    init_engine_tuning(app, db)
+    return app
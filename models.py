@@ -9,6 +9,8 @@ class User(db.Model, UserMixin):
     password = db.Column(db.String(300), nullable=False)
     theme = db.Column(db.String(20), default="default")
     monthly_budget = db.Column(db.Float, default=0)
+    data_version = db.Column(db.Integer, default=0)  # bumped on every write that changes what the user sees
+    data_updated_at = db.Column(db.DateTime)
     expenses = db.relationship('Expense', backref='user', lazy=True)
     incomes = db.relationship('Income', backref='user', lazy=True)
 
@@ -30,6 +32,15 @@ class Expense(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     tags = db.Column(db.String(120))
     currency = db.Column(db.String(8), default="INR")
+    base_amount = db.Column(db.Float)  # amount in BASE_CURRENCY at the rate for `date` (see fx.py)
+    import_key = db.Column(db.String(40))  # set by CSV import, makes re-imports idempotent
+    guest_key = db.Column(db.String(32))  # owner of guest-mode rows (user_id is NULL)
+    __table_args__ = (
+        db.Index('ix_expense_user_date', 'user_id', 'date'),
+        db.Index('ix_expense_guest_date', 'guest_key', 'date'),
+        db.Index('ix_expense_user_category_date', 'user_id', 'category_id', 'date'),
+        db.Index('ix_expense_user_import_key', 'user_id', 'import_key'),
+    )
 
 class Income(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -42,3 +53,96 @@ class Income(db.Model):
     interval = db.Column(db.String(16), default="monthly")
     currency = db.Column(db.String(8), default="INR")
     tags = db.Column(db.String(120))
+    base_amount = db.Column(db.Float)
+    guest_key = db.Column(db.String(32))
+    series_id = db.Column(db.Integer, db.ForeignKey('income.id'))  # recurring template this occurrence came from
+    next_due = db.Column(db.Date)  # on recurring templates: first occurrence not yet materialized (see recurrence.py)
+    __table_args__ = (
+        db.Index('ix_income_user_date', 'user_id', 'date'),
+        db.Index('ix_income_guest_date', 'guest_key', 'date'),
+        db.Index('ix_income_series_date', 'series_id', 'date', unique=True),
+        db.Index('ix_income_next_due', 'next_due'),
+    )
+
+# --- Normalized expense tags (see tags.py); Expense.tags keeps the canonical "a,b" string ---
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(40), unique=True, nullable=False)  # lower-case, without '#'
+
+class ExpenseTag(db.Model):
+    expense_id = db.Column(db.Integer, db.ForeignKey('expense.id', ondelete='CASCADE'), primary_key=True)
+    tag_id = db.Column(db.Integer, db.ForeignKey('tag.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))  # copy of expense.user_id for per-user tag lookups
+    __table_args__ = (
+        db.Index('ix_expense_tag_user_tag', 'user_id', 'tag_id', 'expense_id'),
+    )
+
+# --- Per-user rollups, maintained on every expense/income write (see rollups.py) ---
+class DailyRollup(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    category_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # 0 = uncategorized
+    amount = db.Column(db.Float, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class MonthlyRollup(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    expense_total = db.Column(db.Float, nullable=False, default=0)
+    expense_count = db.Column(db.Integer, nullable=False, default=0)
+    income_total = db.Column(db.Float, nullable=False, default=0)
+    income_count = db.Column(db.Integer, nullable=False, default=0)
+
+class CategoryMonthlyRollup(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    category_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # 0 = uncategorized
+    amount = db.Column(db.Float, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# --- Per-user monthly budgets and the threshold alerts they raised (see budgets.py) ---
+class CategoryBudget(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), primary_key=True)
+    amount = db.Column(db.Float, nullable=False)  # overrides Category.budget for this user
+
+class BudgetAlert(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    category_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # -1 = whole monthly budget
+    threshold = db.Column(db.Integer, primary_key=True, autoincrement=False)  # percent of the budget
+    spent = db.Column(db.Float, nullable=False)
+    budget = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+# --- Dated FX rates: units of BASE_CURRENCY per unit of `currency`, loaded from FX_RATES_FILE ---
+class FxRate(db.Model):
+    currency = db.Column(db.String(8), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    rate = db.Column(db.Float, nullable=False)
+
+# --- Version counters for in-process caches shared across workers (see category_cache.py) ---
+class CacheVersion(db.Model):
+    name = db.Column(db.String(32), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# --- Per-user description autocomplete index (see suggestions.py) ---
+class DescriptionSuggestion(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    description_key = db.Column(db.String(100), primary_key=True)  # lower-cased description
+    description = db.Column(db.String(100), nullable=False)
+    uses = db.Column(db.Integer, nullable=False, default=0)
+    last_used = db.Column(db.Date)
+    __table_args__ = (
+        db.Index('ix_description_suggestion_prefix', 'user_id', 'description_key',
+                 postgresql_ops={'description_key': 'text_pattern_ops'}),
+    )
+
+# --- Applied schema migrations (see migrations.py) ---
+class SchemaMigration(db.Model):
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(80), nullable=False)
+    applied_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,46 @@
+from datetime import datetime
+from sqlalchemy import tuple_
+
+# --- Keyset (cursor) pagination over (date, id), newest first ---
+# A cursor is "<YYYY-MM-DD>_<id>" of the last row on the previous page.
+
+def encode_cursor(row):
+    return f"{row.date.strftime('%Y-%m-%d')}_{row.id}"
+
+def decode_cursor(cursor):
+    try:
+        day, row_id = cursor.split("_", 1)
+        return datetime.strptime(day, "%Y-%m-%d").date(), int(row_id)
+    except (AttributeError, ValueError):
+        return None
+
+def page_size_from(args, default, maximum):
+    value = args.get("per_page", "")
+    size = int(value) if value.isdigit() else default
+    return max(1, min(size, maximum))
+
+def keyset_page(q, model, cursor=None, page_size=50, descending=True):
+    if descending:
+        q = q.order_by(model.date.desc(), model.id.desc())
+    else:
+        q = q.order_by(model.date.asc(), model.id.asc())
+    key = decode_cursor(cursor) if cursor else None
+    if key:
+        position = tuple_(model.date, model.id)
+        q = q.filter(position < tuple_(*key) if descending else position > tuple_(*key))
+    rows = q.limit(page_size + 1).all()
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+def iter_keyset_batches(q, model, batch_size, descending=True):
+    cursor = None
+    while True:
+        rows, cursor = keyset_page(q, model, cursor, batch_size, descending)
+        if rows:
+            yield rows
+        if not cursor:
+            break
+
+def iter_keyset_rows(q, model, batch_size, descending=True):
+    for rows in iter_keyset_batches(q, model, batch_size, descending):
+        yield from rows
@@ -0,0 +1,22 @@
+import sys
+from app import app
+from rollups import rebuild_rollups
+from suggestions import rebuild_suggestions
+from tags import rebuild_tags
+from fulltext import rebuild_fulltext
+
+def main():
+    user_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    with app.app_context():
+        daily, monthly = rebuild_rollups(user_id)
+        scope = f"user {user_id}" if user_id is not None else "all users"
+        print(f"✅ Rollups rebuilt for {scope}: {daily} daily rows, {monthly} monthly rows")
+        suggestions = rebuild_suggestions(user_id)
+        print(f"✅ Description suggestions rebuilt for {scope}: {suggestions} entries")
+        tagged = rebuild_tags(user_id)
+        print(f"✅ Tag links rebuilt for {scope}: {tagged} tagged expenses")
+        if rebuild_fulltext():
+            print("✅ Full-text index rebuilt (all users)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from itertools import islice
+from flask import current_app
+from models import db, Income
+from rollups import add_income_deltas, dialect_insert
+from response_cache import bump_user_data_version
+from fx import to_base
+
+# --- Recurring income: occurrences materialized lazily up to a horizon ---
+# A recurring Income row is the template of its series; every later occurrence is a
+# plain Income row with series_id = template.id. The template's next_due is the
+# series watermark (first occurrence not yet materialized), so a run only generates
+# dates from next_due to the horizon. Each batch claims its range by moving next_due
+# with a compare-and-set UPDATE before inserting, and the unique (series_id, date)
+# index turns any repeated insert into a no-op.
+
+INTERVALS = ("weekly", "monthly")
+
+SERIES_COLUMNS = (Income.id, Income.date, Income.interval, Income.next_due, Income.amount, Income.source,
+                  Income.category_id, Income.currency, Income.tags, Income.user_id, Income.guest_key)
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+def occurrence(anchor, interval, n):
+    """n-th occurrence of a series starting on anchor; month ends are clamped, not carried."""
+    if interval == "weekly":
+        return anchor + timedelta(weeks=n)
+    return add_months(anchor, n)
+
+def _index_on_or_after(anchor, interval, day):
+    if interval == "weekly":
+        return max(0, -(-(day - anchor).days // 7))
+    n = max(0, (day.year - anchor.year) * 12 + day.month - anchor.month)
+    return n if occurrence(anchor, interval, n) >= day else n + 1
+
+def first_due(income):
+    """Initial watermark for a new income: its second occurrence, or None if it does not recur."""
+    if income.recurring and income.interval in INTERVALS and income.series_id is None:
+        return occurrence(income.date, income.interval, 1)
+    return None
+
+def horizon():
+    return date.today() + timedelta(days=current_app.config["RECURRING_HORIZON_DAYS"])
+
+def occurrence_dates(anchor, interval, start, until):
+    n = _index_on_or_after(anchor, interval, start)
+    day = occurrence(anchor, interval, n)
+    while day <= until:
+        yield day
+        n += 1
+        day = occurrence(anchor, interval, n)
+
+def _iter_series(q, until, batch_size):
+    # Due templates in id order, a page at a time so batches can commit in between.
+    columns = q.filter(Income.next_due.isnot(None), Income.next_due <= until) \
+        .with_entities(*SERIES_COLUMNS).order_by(Income.id)
+    last_id = 0
+    while True:
+        rows = columns.filter(Income.id > last_id).limit(batch_size).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1].id
+
+def iter_occurrences(series, until):
+    for s in series:
+        for day in occurrence_dates(s.date, s.interval, s.next_due, until):
+            yield s, day
+
+def _occurrence_row(s, day):
+    try:
+        base_amount = to_base(s.amount, s.currency, day)
+    except ValueError:
+        base_amount = None  # left for fx.renormalize() like any other unconverted row
+    return {"series_id": s.id, "date": day, "amount": s.amount, "source": s.source, "category_id": s.category_id,
+            "currency": s.currency, "tags": s.tags, "user_id": s.user_id, "guest_key": s.guest_key,
+            "recurring": False, "interval": "none", "base_amount": base_amount}
+
+def _flush(batch, watermarks):
+    last_day = {}
+    for s, day in batch:
+        last_day[s.id] = (s, day)
+    claimed = set()
+    for series_id, (s, day) in last_day.items():
+        old = watermarks.get(series_id, s.next_due)
+        if old is None:
+            continue  # lost to a concurrent run in an earlier batch
+        new = occurrence(s.date, s.interval, _index_on_or_after(s.date, s.interval, day) + 1)
+        updated = Income.query.filter(Income.id == series_id, Income.next_due == old) \
+            .update({"next_due": new}, synchronize_session=False)
+        watermarks[series_id] = new if updated else None
+        if updated:
+            claimed.add(series_id)
+    batch = [(s, day) for s, day in batch if s.id in claimed]
+    if batch:
+        # A watermark reset by hand must not double-count rows that already exist.
+        existing = set(db.session.query(Income.series_id, Income.date).filter(
+            Income.series_id.in_(claimed), Income.date.between(min(d for _, d in batch), max(d for _, d in batch))))
+        batch = [(s, day) for s, day in batch if (s.id, day) not in existing]
+    rows = [_occurrence_row(s, day) for s, day in batch]
+    if rows:
+        insert = dialect_insert()
+        if insert is not None:
+            db.session.execute(insert(Income).on_conflict_do_nothing(index_elements=["series_id", "date"]), rows)
+        else:
+            db.session.execute(Income.__table__.insert(), rows)
+        deltas = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        for row in rows:
+            if row["user_id"] is not None:
+                delta = deltas[row["user_id"]][row["date"]]
+                delta[0] += row["base_amount"] or 0
+                delta[1] += 1
+        for user_id, user_deltas in deltas.items():
+            add_income_deltas(user_id, user_deltas)
+            bump_user_data_version(user_id)
+    db.session.commit()
+    return len(rows)
+
+def materialize(q, until=None, batch_size=None):
+    """Insert every due occurrence of the series q selects; returns the number of rows added.
+
+    Logged-in owners get their rollups and data version updated here; guest callers
+    bump their session version themselves.
+    """
+    until = until or horizon()
+    batch_size = batch_size or current_app.config["RECURRING_BATCH_SIZE"]
+    occurrences = iter_occurrences(_iter_series(q, until, batch_size), until)
+    watermarks, inserted = {}, 0
+    while True:
+        batch = list(islice(occurrences, batch_size))
+        if not batch:
+            return inserted
+        inserted += _flush(batch, watermarks)
+
+def start_series(q=None):
+    """Set the watermark on recurring incomes that predate it (e.g. after an upgrade)."""
+    q = (q or Income.query).filter(Income.recurring.is_(True), Income.series_id.is_(None),
+                                   Income.next_due.is_(None), Income.interval.in_(INTERVALS))
+    started = 0
+    for income in q:
+        income.next_due = first_due(income)
+        started += 1
+    db.session.commit()
+    return started
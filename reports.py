@@ -0,0 +1,46 @@
+from sqlalchemy import extract, func
+from models import db, Expense, DailyRollup
+
+# --- Print report summaries: totals, per-category and per-month subtotals in SQL ---
+# Logged-in users are summarised from the daily rollups; guests from their own rows.
+
+def _summarize(q, day_col, cat_col, amount_col, count_col, categories_by_id):
+    by_cat = (q.with_entities(cat_col, func.sum(amount_col), count_col)
+              .group_by(cat_col).order_by(func.sum(amount_col).desc()).all())
+    year, month = extract('year', day_col), extract('month', day_col)
+    by_month = (q.with_entities(year, month, func.sum(amount_col), count_col)
+                .group_by(year, month).order_by(year, month).all())
+    category_totals = [(categories_by_id.get(cat_id or None), total or 0, count) for cat_id, total, count in by_cat if count]
+    month_totals = [(f"{int(y):04d}-{int(m):02d}", total or 0, count) for y, m, total, count in by_month if count]
+    return {
+        "total": sum(total for _, total, _ in category_totals),
+        "count": sum(count for _, _, count in category_totals),
+        "category_totals": category_totals,
+        "month_totals": month_totals,
+    }
+
+def report_summary(q_exp, categories_by_id, user_id=None, category_id=None, dt_from=None, dt_to=None):
+    if user_id is None:
+        return _summarize(q_exp, Expense.date, Expense.category_id, Expense.base_amount,
+                          func.count(Expense.id), categories_by_id)
+    q = db.session.query(DailyRollup).filter(DailyRollup.user_id == user_id)
+    if category_id:
+        q = q.filter(DailyRollup.category_id == category_id)
+    if dt_from:
+        q = q.filter(DailyRollup.day >= dt_from)
+    if dt_to:
+        q = q.filter(DailyRollup.day <= dt_to)
+    return _summarize(q, DailyRollup.day, DailyRollup.category_id, DailyRollup.amount,
+                      func.sum(DailyRollup.count), categories_by_id)
+
+# Jinja's streaming yields tiny fragments; group them into reasonably sized chunks.
+def coalesce_chunks(chunks, size=16384):
+    buf, length = [], 0
+    for chunk in chunks:
+        buf.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(buf)
+            buf, length = [], 0
+    if buf:
+        yield "".join(buf)
@@ -0,0 +1,131 @@
+import functools
+import hashlib
+import importlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, date, time as dt_time
+from flask import current_app, request, session, Response
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+from models import db, User
+from category_cache import category_cache_version
+
+# --- Per-user data version: conditional GET and version-keyed caching ---
+# Every write that changes what a user sees bumps their data version (guests keep
+# theirs in the session). Read routes derive an ETag/Last-Modified from it and
+# answer 304 without touching the data; computed results are cached under it, so
+# a stale entry is simply never looked up again.
+
+class LRUCache:
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+class NullCache:
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+def init_response_cache(app):
+    backend = app.config["RESPONSE_CACHE_BACKEND"]
+    if backend == "memory":
+        cache = LRUCache(app.config["RESPONSE_CACHE_SIZE"], app.config["RESPONSE_CACHE_TTL"])
+    elif backend in ("none", ""):
+        cache = NullCache()
+    else:
+        # Any object with get(key) and set(key, value), built by factory(app)
+        module, _, factory = backend.partition(":")
+        cache = getattr(importlib.import_module(module), factory)(app)
+    app.extensions["response_cache"] = cache
+    return cache
+
+def cached(key, compute):
+    cache = current_app.extensions["response_cache"]
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value)
+    return value
+
+def _now():
+    return datetime.now().replace(microsecond=0)
+
+# Call inside the transaction that changes the user's data.
+def bump_user_data_version(user_id):
+    User.query.filter_by(id=user_id).update(
+        {"data_version": db.func.coalesce(User.data_version, 0) + 1, "data_updated_at": _now()},
+        synchronize_session=False)
+
+def bump_all_data_versions():
+    # After bulk jobs that change every user's derived data (e.g. FX re-normalization)
+    User.query.update({"data_version": db.func.coalesce(User.data_version, 0) + 1, "data_updated_at": _now()},
+                      synchronize_session=False)
+
+def bump_data_version():
+    if current_user.is_authenticated:
+        bump_user_data_version(current_user.id)
+    else:
+        session["data_version"] = session.get("data_version", 0) + 1
+        session["data_updated_at"] = _now().timestamp()
+
+def data_version():
+    """(owner, version, last_modified) for the current user or guest session."""
+    if current_user.is_authenticated:
+        return f"u{current_user.id}", current_user.data_version or 0, current_user.data_updated_at
+    updated_at = session.get("data_updated_at")
+    return (f"g{session.get('guest_key', '')}", session.get("data_version", 0),
+            datetime.fromtimestamp(updated_at) if updated_at else None)
+
+def version_key(*parts):
+    """Cache key for data derived from the current user's rows as of today."""
+    owner, version, _ = data_version()
+    return ":".join(str(p) for p in (*parts, owner, version, category_cache_version(), date.today()))
+
+def conditional_get(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # Pending flashes are rendered once and must not be revalidated away.
+        if "_flashes" in session:
+            return view(*args, **kwargs)
+        owner, version, updated_at = data_version()
+        # Responses also depend on categories, today's date and the onboarding banner.
+        raw = f"{owner}:{version}:{category_cache_version()}:{date.today()}:{bool(session.get('onboarded'))}"
+        etag = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+        midnight = datetime.combine(date.today(), dt_time.min)
+        last_modified = max(updated_at, midnight) if updated_at else midnight
+        if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            response = Response(status=304)
+        else:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.vary.add("Cookie")
+        return response
+    return wrapper
@@ -0,0 +1,175 @@
+from collections import defaultdict
+from sqlalchemy import func, and_, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Expense, Income, DailyRollup, MonthlyRollup, CategoryMonthlyRollup
+
+# --- Rollup maintenance: call inside the same transaction as the expense/income write ---
+
+# INSERT ... ON CONFLICT builder for the current dialect, or None if unsupported.
+def dialect_insert():
+    return {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(db.engine.dialect.name)
+
+def _upsert_many(model, key_cols, delta_cols, rows):
+    if not rows:
+        return
+    insert = dialect_insert()
+    if insert is not None:
+        stmt = insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_cols),
+            set_={col: getattr(model, col) + stmt.excluded[col] for col in delta_cols})
+        db.session.execute(stmt, rows)
+        return
+    for values in rows:
+        row = model.query.filter_by(**{k: values[k] for k in key_cols}).first()
+        if row is None:
+            db.session.add(model(**values))
+        else:
+            for col in delta_cols:
+                setattr(row, col, getattr(row, col) + values[col])
+
+def _upsert(model, keys, deltas):
+    _upsert_many(model, list(keys), list(deltas), [{**keys, **deltas}])
+
+def add_expense_amount(user_id, day, category_id, amount, count=1):
+    if user_id is None:
+        return
+    _upsert(DailyRollup, {"user_id": user_id, "day": day, "category_id": category_id or 0},
+            {"amount": amount, "count": count})
+    _upsert(MonthlyRollup, {"user_id": user_id, "year": day.year, "month": day.month},
+            {"expense_total": amount, "expense_count": count})
+    _upsert(CategoryMonthlyRollup, {"user_id": user_id, "year": day.year, "month": day.month,
+                                    "category_id": category_id or 0},
+            {"amount": amount, "count": count})
+
+# deltas: {(day, category_id): (amount, count)}, applied with one batched upsert per table
+def add_expense_deltas(user_id, deltas):
+    if user_id is None or not deltas:
+        return
+    monthly = defaultdict(lambda: [0, 0])
+    by_category = defaultdict(lambda: [0, 0])
+    daily_rows = []
+    for (day, category_id), (amount, count) in deltas.items():
+        daily_rows.append({"user_id": user_id, "day": day, "category_id": category_id or 0,
+                           "amount": amount, "count": count})
+        for m in (monthly[(day.year, day.month)], by_category[(day.year, day.month, category_id or 0)]):
+            m[0] += amount
+            m[1] += count
+    monthly_rows = [{"user_id": user_id, "year": y, "month": mo, "expense_total": amount, "expense_count": count}
+                    for (y, mo), (amount, count) in monthly.items()]
+    category_rows = [{"user_id": user_id, "year": y, "month": mo, "category_id": cat_id, "amount": amount,
+                      "count": count} for (y, mo, cat_id), (amount, count) in by_category.items()]
+    _upsert_many(DailyRollup, ("user_id", "day", "category_id"), ("amount", "count"), daily_rows)
+    _upsert_many(MonthlyRollup, ("user_id", "year", "month"), ("expense_total", "expense_count"), monthly_rows)
+    _upsert_many(CategoryMonthlyRollup, ("user_id", "year", "month", "category_id"), ("amount", "count"),
+                 category_rows)
+
+def add_income_deltas(user_id, deltas):
+    # deltas: {day: (amount, count)}
+    if user_id is None or not deltas:
+        return
+    monthly = defaultdict(lambda: [0, 0])
+    for day, (amount, count) in deltas.items():
+        m = monthly[(day.year, day.month)]
+        m[0] += amount
+        m[1] += count
+    _upsert_many(MonthlyRollup, ("user_id", "year", "month"), ("income_total", "income_count"),
+                 [{"user_id": user_id, "year": y, "month": mo, "income_total": amount, "income_count": count}
+                  for (y, mo), (amount, count) in monthly.items()])
+
+def add_income_amount(user_id, day, amount, count=1):
+    if user_id is None:
+        return
+    _upsert(MonthlyRollup, {"user_id": user_id, "year": day.year, "month": day.month},
+            {"income_total": amount, "income_count": count})
+
+def record_expense(expense, sign=1):
+    add_expense_amount(expense.user_id, expense.date, expense.category_id, sign * (expense.base_amount or 0), sign)
+
+def record_income(income, sign=1):
+    add_income_amount(income.user_id, income.date, sign * (income.base_amount or 0), sign)
+
+# Set-based helpers: aggregate the rows a query matches into rollup deltas.
+def expense_deltas(q_exp):
+    rows = (q_exp.with_entities(Expense.date, Expense.category_id, func.sum(Expense.base_amount), func.count(Expense.id))
+            .group_by(Expense.date, Expense.category_id))
+    return {(day, cat_id): (total, count) for day, cat_id, total, count in rows}
+
+def income_deltas(q_inc):
+    rows = q_inc.with_entities(Income.date, func.sum(Income.base_amount), func.count(Income.id)).group_by(Income.date)
+    return {day: (total, count) for day, total, count in rows}
+
+# --- Reads ---
+
+def _rollup_days(q, start=None, end=None):
+    if start:
+        q = q.filter(DailyRollup.day >= start)
+    if end:
+        q = q.filter(DailyRollup.day <= end)
+    return q
+
+def rollup_expense_totals_by_day(user_id, start, end=None):
+    q = db.session.query(DailyRollup.day, func.sum(DailyRollup.amount)).filter(DailyRollup.user_id == user_id)
+    rows = _rollup_days(q, start, end).group_by(DailyRollup.day).all()
+    return {day: total or 0 for day, total in rows}
+
+def rollup_expense_totals_by_category(user_id, start=None, end=None):
+    q = db.session.query(DailyRollup.category_id, func.sum(DailyRollup.amount)).filter(DailyRollup.user_id == user_id)
+    rows = _rollup_days(q, start, end).group_by(DailyRollup.category_id).all()
+    return {cat_id: total or 0 for cat_id, total in rows}
+
+def rollup_income_total_since(user_id, start):
+    return (db.session.query(func.sum(MonthlyRollup.income_total))
+            .filter(MonthlyRollup.user_id == user_id,
+                    or_(MonthlyRollup.year > start.year,
+                        and_(MonthlyRollup.year == start.year, MonthlyRollup.month >= start.month)))
+            .scalar()) or 0
+
+# --- Bulk rebuild (backfill or repair) ---
+
+def rebuild_rollups(user_id=None):
+    daily_q = (db.session.query(Expense.user_id, Expense.date, func.coalesce(Expense.category_id, 0),
+                                func.sum(Expense.base_amount), func.count(Expense.id))
+               .filter(Expense.user_id.isnot(None))
+               .group_by(Expense.user_id, Expense.date, func.coalesce(Expense.category_id, 0)))
+    income_q = (db.session.query(Income.user_id, Income.date, func.sum(Income.base_amount), func.count(Income.id))
+                .filter(Income.user_id.isnot(None))
+                .group_by(Income.user_id, Income.date))
+    if user_id is not None:
+        daily_q = daily_q.filter(Expense.user_id == user_id)
+        income_q = income_q.filter(Income.user_id == user_id)
+        DailyRollup.query.filter_by(user_id=user_id).delete()
+        MonthlyRollup.query.filter_by(user_id=user_id).delete()
+        CategoryMonthlyRollup.query.filter_by(user_id=user_id).delete()
+    else:
+        DailyRollup.query.delete()
+        MonthlyRollup.query.delete()
+        CategoryMonthlyRollup.query.delete()
+
+    daily_rows, monthly = [], defaultdict(lambda: {"expense_total": 0, "expense_count": 0,
+                                                   "income_total": 0, "income_count": 0})
+    by_category = defaultdict(lambda: {"amount": 0, "count": 0})
+    for uid, day, cat_id, total, count in daily_q:
+        daily_rows.append({"user_id": uid, "day": day, "category_id": cat_id, "amount": total, "count": count})
+        m = monthly[(uid, day.year, day.month)]
+        m["expense_total"] += total
+        m["expense_count"] += count
+        c = by_category[(uid, day.year, day.month, cat_id)]
+        c["amount"] += total
+        c["count"] += count
+    for uid, day, total, count in income_q:
+        m = monthly[(uid, day.year, day.month)]
+        m["income_total"] += total
+        m["income_count"] += count
+    monthly_rows = [dict(user_id=uid, year=y, month=mo, **vals) for (uid, y, mo), vals in monthly.items()]
+
+    if daily_rows:
+        db.session.execute(DailyRollup.__table__.insert(), daily_rows)
+    if monthly_rows:
+        db.session.execute(MonthlyRollup.__table__.insert(), monthly_rows)
+    category_rows = [dict(user_id=uid, year=y, month=mo, category_id=cat_id, **vals)
+                     for (uid, y, mo, cat_id), vals in by_category.items()]
+    if category_rows:
+        db.session.execute(CategoryMonthlyRollup.__table__.insert(), category_rows)
+    db.session.commit()
+    return len(daily_rows), len(monthly_rows)
@@ -0,0 +1,143 @@
+import argparse
+import itertools
+import math
+import random
+import time
+from datetime import date, timedelta
+from werkzeug.security import generate_password_hash
+from app import app, db
+from models import User, Expense, Income
+from category_cache import category_by_name
+from rollups import rebuild_rollups
+from suggestions import rebuild_suggestions
+from tags import rebuild_tags
+from fx import to_base
+
+# --- Seeded synthetic data at production scale ---
+# Bulk-loads N users with realistic category, amount, date, tag and description
+# distributions using batched executemany inserts, then rebuilds the rollups.
+
+# category: (weight, median amount, [(description, weight)], [tags])
+PROFILES = {
+    "Food": (40, 180, [("Lunch", 10), ("Coffee", 9), ("Dinner at restaurant", 6), ("Groceries", 6),
+                       ("Breakfast", 5), ("Snacks", 4), ("Swiggy order", 4), ("Zomato order", 4), ("Tea", 3)],
+             ["food", "cafe", "groceries", "friends", "delivery"]),
+    "Transport": (20, 90, [("Uber", 8), ("Auto rickshaw fare", 6), ("Metro card recharge", 4),
+                           ("Bus pass", 3), ("Petrol", 4), ("Ola", 5), ("Parking", 2)],
+                  ["transport", "commute", "travel", "fuel"]),
+    "Entertainment": (8, 350, [("Movie ticket", 5), ("Netflix subscription", 2), ("Concert", 1),
+                               ("Gaming subscription", 2), ("Bowling", 1)],
+                      ["movie", "subscription", "weekend", "friends"]),
+    "Health": (5, 600, [("Pharmacy", 5), ("Doctor visit", 3), ("Gym membership", 2), ("Lab tests", 1)],
+               ["health", "doctor", "fitness"]),
+    "Utilities": (10, 900, [("Electricity bill", 3), ("Mobile recharge", 5), ("Internet bill", 3),
+                            ("Water bill", 1), ("Gas cylinder", 1)],
+                  ["bills", "monthly", "home"]),
+    "Shopping": (12, 1200, [("Clothes", 4), ("Amazon order", 6), ("Electronics", 1), ("Books", 2),
+                            ("Home supplies", 3)],
+                 ["shopping", "online", "home", "gift"]),
+    "Other": (5, 300, [("Miscellaneous", 3), ("Gift", 2), ("Donation", 1), ("Stationery", 2)],
+              ["misc", "gift"]),
+}
+CURRENCIES = [("INR", 94), ("USD", 4), ("EUR", 2)]
+INCOME_SOURCES = [("Salary", 8), ("Freelance project", 3), ("Interest", 2), ("Refund", 1), ("Bonus", 1)]
+
+def _cumulative(weighted):
+    items, weights = zip(*weighted)
+    return list(items), list(itertools.accumulate(weights))
+
+class Generator:
+    def __init__(self, seed, days, today=None):
+        self.rng = random.Random(seed)
+        self.today = today or date.today()
+        self.days = days
+        cats = category_by_name()
+        self.profiles = [(cats[name.lower()].id, median, _cumulative(descriptions), tags)
+                         for name, (weight, median, descriptions, tags) in PROFILES.items() if name.lower() in cats]
+        self.cat_weights = list(itertools.accumulate(PROFILES[name][0] for name in PROFILES if name.lower() in cats))
+        self.currencies, self.currency_weights = _cumulative(CURRENCIES)
+        self.sources, self.source_weights = _cumulative(INCOME_SOURCES)
+        # Weekends see more spending; recent days more than the far past.
+        self.day_offsets = list(range(days))
+        self.day_weights = list(itertools.accumulate(
+            (1.4 if (self.today - timedelta(days=d)).weekday() >= 5 else 1.0) * (1 + 1.0 / (1 + d / 90))
+            for d in self.day_offsets))
+
+    def expense(self, user_id):
+        rng = self.rng
+        cat_id, median, (names, name_weights), tags = rng.choices(self.profiles, cum_weights=self.cat_weights)[0]
+        description = rng.choices(names, cum_weights=name_weights)[0]
+        if rng.random() < 0.15:
+            description = f"{description} #{rng.randint(1, 50)}"
+        amount = round(max(1.0, rng.lognormvariate(math.log(median), 0.6)), 2)
+        day = self.today - timedelta(days=rng.choices(self.day_offsets, cum_weights=self.day_weights)[0])
+        tag_count = rng.choices([0, 1, 2, 3], [30, 40, 20, 10])[0]
+        currency = rng.choices(self.currencies, cum_weights=self.currency_weights)[0]
+        if currency != "INR":
+            amount = round(amount / 85, 2) or 0.01
+        return {"user_id": user_id, "category_id": cat_id, "description": description, "amount": amount,
+                "date": day, "tags": ",".join(rng.sample(tags, min(tag_count, len(tags)))),
+                "currency": currency, "base_amount": to_base(amount, currency, day)}
+
+    def income(self, user_id):
+        rng = self.rng
+        source = rng.choices(self.sources, cum_weights=self.source_weights)[0]
+        amount = round(rng.lognormvariate(math.log(40000 if source == "Salary" else 5000), 0.4), 2)
+        day = self.today - timedelta(days=rng.randrange(self.days))
+        return {"user_id": user_id, "source": source, "amount": amount, "date": day, "tags": source.lower(),
+                "currency": "INR", "base_amount": amount, "recurring": False, "interval": "monthly"}
+
+def _insert_batched(table, rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+
+def generate(users=1, expenses_per_user=1000, incomes_per_user=24, days=730, seed=42,
+             prefix="bench", password="bench", batch_size=10000, verbose=True):
+    gen = Generator(seed, days)
+    password_hash = generate_password_hash(password)
+    user_ids = []
+    for n in range(users):
+        username = f"{prefix}{n}"
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            user = User(username=username, password=password_hash)
+            db.session.add(user)
+            db.session.commit()
+        user_ids.append(user.id)
+    for uid in user_ids:
+        started = time.time()
+        _insert_batched(Expense.__table__, (gen.expense(uid) for _ in range(expenses_per_user)), batch_size)
+        _insert_batched(Income.__table__, (gen.income(uid) for _ in range(incomes_per_user)), batch_size)
+        rebuild_rollups(uid)
+        rebuild_suggestions(uid)
+        rebuild_tags(uid)
+        if verbose:
+            print(f"  user {uid}: {expenses_per_user} expenses, {incomes_per_user} incomes in {time.time() - started:.1f}s")
+    return user_ids
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic users, expenses and incomes.")
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--expenses-per-user", type=int, default=10000)
+    parser.add_argument("--incomes-per-user", type=int, default=24)
+    parser.add_argument("--days", type=int, default=730, help="history span in days")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prefix", default="bench", help="usernames are <prefix>0..<prefix>N-1")
+    parser.add_argument("--password", default="bench")
+    args = parser.parse_args()
+    with app.app_context():
+        started = time.time()
+        user_ids = generate(args.users, args.expenses_per_user, args.incomes_per_user, args.days,
+                            args.seed, args.prefix, args.password)
+        print(f"✅ Seeded {len(user_ids)} users in {time.time() - started:.1f}s (password: {args.password})")
+
+if __name__ == "__main__":
+    main()
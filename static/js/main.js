@@ -12,32 +12,46 @@ document.addEventListener("DOMContentLoaded", function () {
         };
     }
 
-    // Description autocomplete (as before)
+    // Description autocomplete: debounced, cached per prefix, stale requests aborted
     const descInput = document.getElementById('description');
     const suggestionBox = document.getElementById('desc-suggestions');
     if(descInput && suggestionBox) {
-        let lastQuery = "";
+        const cache = new Map();
+        let timer = null;
+        let inflight = null;
+        const render = (data) => {
+            suggestionBox.innerHTML = "";
+            if(data.length) {
+              data.forEach(s => {
+                let el = document.createElement('button');
+                el.type = 'button';
+                el.className = 'list-group-item list-group-item-action';
+                el.textContent = s;
+                el.onclick = () => { descInput.value = s; suggestionBox.style.display = 'none'; };
+                suggestionBox.appendChild(el);
+              });
+              suggestionBox.style.display = 'block';
+            } else { suggestionBox.style.display = 'none'; }
+        };
         descInput.addEventListener('input', function() {
             const q = this.value.trim();
+            clearTimeout(timer);
+            if(inflight) { inflight.abort(); inflight = null; }
             if(q.length < 1) { suggestionBox.style.display = 'none'; return; }
-            lastQuery = q;
-            fetch(`/suggest_descriptions?q=${encodeURIComponent(q)}`)
-              .then(res => res.json())
-              .then(data => {
-                if(descInput.value.trim() !== lastQuery) return;
-                suggestionBox.innerHTML = "";
-                if(data.length) {
-                  data.forEach(s => {
-                    let el = document.createElement('button');
-                    el.type = 'button';
-                    el.className = 'list-group-item list-group-item-action';
-                    el.textContent = s;
-                    el.onclick = () => { descInput.value = s; suggestionBox.style.display = 'none'; };
-                    suggestionBox.appendChild(el);
-                  });
-                  suggestionBox.style.display = 'block';
-                } else { suggestionBox.style.display = 'none'; }
-              });
+            const key = q.toLowerCase();
+            if(cache.has(key)) { render(cache.get(key)); return; }
+            timer = setTimeout(() => {
+                const controller = new AbortController();
+                inflight = controller;
+                fetch(`/suggest_descriptions?q=${encodeURIComponent(q)}`, { signal: controller.signal })
+                  .then(res => res.json())
+                  .then(data => {
+                    cache.set(key, data);
+                    if(inflight === controller) inflight = null;
+                    if(descInput.value.trim().toLowerCase() === key) render(data);
+                  })
+                  .catch(err => { if(err.name !== 'AbortError') console.error(err); });
+            }, 150);
         });
         document.addEventListener('click', function(e){
             if(!suggestionBox.contains(e.target) && e.target !== descInput) {
@@ -46,6 +60,82 @@ document.addEventListener("DOMContentLoaded", function () {
         });
     }
 
+    // Expense list "Load more" (keyset pagination via /api/expenses)
+    const loadMoreBtn = document.getElementById('loadMoreBtn');
+    const expTableBody = document.getElementById('expTableBody');
+    if(loadMoreBtn && expTableBody) {
+        const cell = (text) => { let td = document.createElement('td'); td.textContent = text; return td; };
+        loadMoreBtn.addEventListener('click', function(e) {
+            e.preventDefault();
+            const url = new URL(loadMoreBtn.dataset.apiUrl, window.location.origin);
+            url.searchParams.set('cursor', loadMoreBtn.dataset.cursor);
+            loadMoreBtn.classList.add('disabled');
+            fetch(url)
+              .then(res => res.json())
+              .then(data => {
+                data.expenses.forEach(exp => {
+                    let tr = document.createElement('tr');
+                    let selectTd = document.createElement('td');
+                    selectTd.innerHTML = `<input type="checkbox" class="form-check-input bulk-select" name="ids" form="bulkForm" aria-label="Select">`;
+                    selectTd.querySelector('input').value = exp.id;
+                    tr.appendChild(selectTd);
+                    tr.appendChild(cell(exp.date));
+                    tr.appendChild(cell(exp.category ? `${exp.category.icon} ${exp.category.name}` : ''));
+                    tr.appendChild(cell(exp.description));
+                    tr.appendChild(cell(`₹${exp.amount}`));
+                    let tagsTd = document.createElement('td');
+                    exp.tags.forEach(tag => {
+                        let chip = document.createElement('span');
+                        chip.className = 'badge rounded-pill bg-primary tagchip';
+                        chip.textContent = tag;
+                        tagsTd.appendChild(chip);
+                    });
+                    tr.appendChild(tagsTd);
+                    let actionTd = document.createElement('td');
+                    actionTd.innerHTML = `<a class="btn btn-sm btn-warning me-2">Edit</a>` +
+                        `<form method="POST" style="display:inline;"><button type="submit" class="btn btn-sm btn-danger">Delete</button></form>`;
+                    actionTd.querySelector('a').href = exp.edit_url;
+                    actionTd.querySelector('form').action = exp.delete_url;
+                    tr.appendChild(actionTd);
+                    expTableBody.appendChild(tr);
+                });
+                if(data.next_cursor) {
+                    loadMoreBtn.dataset.cursor = data.next_cursor;
+                    loadMoreBtn.classList.remove('disabled');
+                } else {
+                    loadMoreBtn.remove();
+                }
+              })
+              .catch(() => loadMoreBtn.classList.remove('disabled'));
+        });
+    }
+
+    // Bulk actions on the expense list: multi-select rows, or everything matching the filter
+    const bulkForm = document.getElementById('bulkForm');
+    if(bulkForm) {
+        const action = document.getElementById('bulkAction');
+        const count = document.getElementById('bulkCount');
+        const selectAll = document.getElementById('bulkSelectAll');
+        const boxes = () => Array.from(document.querySelectorAll('.bulk-select'));
+        const updateCount = () => { count.textContent = boxes().filter(b => b.checked).length; };
+        const showParams = () => {
+            bulkForm.querySelectorAll('.bulk-param').forEach(el => el.classList.toggle('d-none', el.dataset.action !== action.value));
+        };
+        action.addEventListener('change', showParams);
+        selectAll.addEventListener('change', () => { boxes().forEach(b => { b.checked = selectAll.checked; }); updateCount(); });
+        document.addEventListener('change', e => { if(e.target.classList.contains('bulk-select')) updateCount(); });
+        bulkForm.addEventListener('submit', function(e) {
+            const byFilter = bulkForm.scope.value === 'filter';
+            const n = boxes().filter(b => b.checked).length;
+            if(!byFilter && !n) { e.preventDefault(); alert('Select at least one expense.'); return; }
+            if(action.value === 'delete' && !confirm(byFilter ? 'Delete every expense matching the filter?' : `Delete ${n} expense(s)?`)) {
+                e.preventDefault();
+            }
+        });
+        showParams();
+        updateCount();
+    }
+
     // Dynamic add tag chips for tag fields (if present)
     document.querySelectorAll(".tag-input").forEach(tagInput => {
         tagInput.addEventListener("keydown", function(e) {
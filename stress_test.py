@@ -0,0 +1,104 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# --- Multi-process read/write stress test per engine profile ---
+# Each profile gets a fresh SQLite database (unless DATABASE_URL is set) and N worker
+# processes, each logged in as its own user, issuing a mix of dashboard/list reads
+# and expense writes for a fixed duration. Reports throughput, latency and errors
+# ("database is locked" shows up as 500s) so DB_ENGINE_PROFILE=default and =tuned
+# can be compared side by side.
+
+READS = ["/api/dashboard", "/expenses", "/search?q=coffee"]
+
+def _configure(url, profile):
+    os.environ["DATABASE_URL"] = url
+    os.environ["DB_ENGINE_PROFILE"] = profile
+    os.environ["RESPONSE_CACHE_BACKEND"] = "none"  # every read should reach the database
+
+def _setup(url, profile, workers):
+    _configure(url, profile)
+    from app import app
+    app.logger.disabled = True
+    for i in range(workers):
+        app.test_client().post("/signup", data={"username": f"stress{i}", "password": "stress"})
+
+def _worker(index, url, profile, duration, write_ratio, ready, start, results):
+    _configure(url, profile)
+    from app import app
+    app.logger.disabled = True
+    rng = random.Random(index)
+    client = app.test_client()
+    client.post("/login", data={"username": f"stress{index}", "password": "stress"})
+    ready.put(index)
+    start.wait()
+    deadline = time.monotonic() + duration
+    stats = {"reads": 0, "writes": 0, "errors": 0, "latencies": []}
+    today = date.today()
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        if rng.random() < write_ratio:
+            response = client.post("/add", data={
+                "amount": str(rng.randint(10, 500)), "description": f"Coffee {rng.randint(1, 50)}",
+                "category": str(rng.randint(1, 7)), "date": (today - timedelta(days=rng.randrange(60))).isoformat(),
+                "tags": "stress"})
+            ok, kind = response.status_code < 500, "writes"
+        else:
+            response = client.get(rng.choice(READS))
+            ok, kind = response.status_code < 500, "reads"
+        stats["latencies"].append(time.perf_counter() - started)
+        stats[kind if ok else "errors"] += 1
+    results.put(stats)
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+def run_profile(profile, args):
+    url = os.environ.get("DATABASE_URL") or "sqlite:///" + os.path.join(tempfile.mkdtemp(), f"stress-{profile}.db")
+    ctx = multiprocessing.get_context("spawn")
+    setup = ctx.Process(target=_setup, args=(url, profile, args.workers))
+    setup.start()
+    setup.join()
+    ready, results, start = ctx.Queue(), ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=_worker, args=(i, url, profile, args.duration, args.write_ratio, ready, start, results))
+             for i in range(args.workers)]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.get()
+    start.set()
+    collected = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    latencies = sorted(l for s in collected for l in s["latencies"])
+    reads, writes, errors = (sum(s[k] for s in collected) for k in ("reads", "writes", "errors"))
+    return {"profile": profile, "ops_per_s": (reads + writes) / args.duration, "reads": reads, "writes": writes,
+            "errors": errors, "p50_ms": percentile(latencies, 50) * 1000, "p99_ms": percentile(latencies, 99) * 1000}
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent read/write stress test per DB engine profile.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per profile")
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--profiles", default="default,tuned")
+    args = parser.parse_args()
+
+    rows = []
+    for profile in args.profiles.split(","):
+        print(f"Running profile {profile!r}: {args.workers} processes for {args.duration:.0f}s...")
+        rows.append(run_profile(profile, args))
+    print(f"\n{'profile':<10}{'ops/s':>10}{'reads':>9}{'writes':>9}{'errors':>9}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in rows:
+        print(f"{r['profile']:<10}{r['ops_per_s']:>10.1f}{r['reads']:>9}{r['writes']:>9}{r['errors']:>9}"
+              f"{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+    return 1 if any(r["errors"] for r in rows if r["profile"] == "tuned") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
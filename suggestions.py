@@ -0,0 +1,106 @@
+from sqlalchemy import case, func
+from models import db, Expense, DescriptionSuggestion
+from rollups import dialect_insert
+
+# --- Description autocomplete index: distinct descriptions per user with usage counts ---
+# Maintained in the same transaction as expense writes; answers prefix lookups from
+# the (user_id, description_key) index instead of scanning expenses. last_used only
+# moves forward on writes; rebuild_suggestions() recomputes it exactly.
+
+SUGGESTION_LIMIT = 5
+
+def _key(description):
+    return description.strip().lower()[:100]
+
+def record_descriptions(user_id, entries):
+    # entries: iterable of (description, day, sign)
+    if user_id is None:
+        return
+    merged = {}
+    for description, day, sign in entries:
+        key = _key(description)
+        if not key:
+            continue
+        row = merged.setdefault(key, {"user_id": user_id, "description_key": key,
+                                      "description": description.strip()[:100], "uses": 0, "last_used": day})
+        row["uses"] += sign
+        if day and (row["last_used"] is None or day > row["last_used"]):
+            row["last_used"] = day
+    rows = list(merged.values())
+    if not rows:
+        return
+    insert = dialect_insert()
+    if insert is not None:
+        stmt = insert(DescriptionSuggestion)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "description_key"],
+            set_={
+                "uses": DescriptionSuggestion.uses + stmt.excluded.uses,
+                "last_used": case((stmt.excluded.last_used > DescriptionSuggestion.last_used, stmt.excluded.last_used),
+                                  else_=func.coalesce(DescriptionSuggestion.last_used, stmt.excluded.last_used)),
+            })
+        db.session.execute(stmt, rows)
+        return
+    for values in rows:
+        row = DescriptionSuggestion.query.filter_by(user_id=user_id, description_key=values["description_key"]).first()
+        if row is None:
+            db.session.add(DescriptionSuggestion(**values))
+        else:
+            row.uses += values["uses"]
+            if values["last_used"] and (row.last_used is None or values["last_used"] > row.last_used):
+                row.last_used = values["last_used"]
+
+def record_expense_description(expense, sign=1):
+    record_descriptions(expense.user_id, [(expense.description, expense.date, sign)])
+
+def suggest(user_id, prefix, limit=SUGGESTION_LIMIT):
+    key = _key(prefix)
+    q = (db.session.query(DescriptionSuggestion.description)
+         .filter(DescriptionSuggestion.user_id == user_id,
+                 DescriptionSuggestion.uses > 0,
+                 DescriptionSuggestion.description_key.startswith(key, autoescape=True)))
+    if db.engine.dialect.name == "sqlite":
+        # SQLite only turns LIKE into an index range for NOCASE columns; give it the range explicitly.
+        q = q.filter(DescriptionSuggestion.description_key >= key,
+                     DescriptionSuggestion.description_key < key + "\U0010ffff")
+    q = q.order_by(DescriptionSuggestion.uses.desc(), DescriptionSuggestion.last_used.desc())
+    return [d for (d,) in q.limit(limit)]
+
+# Guests have no index; their handful of rows is grouped directly.
+def suggest_from_expenses(q_exp, prefix, limit=SUGGESTION_LIMIT):
+    rows = (q_exp.with_entities(Expense.description)
+            .filter(Expense.description.istartswith(prefix.strip(), autoescape=True))
+            .group_by(Expense.description)
+            .order_by(func.count(Expense.id).desc(), func.max(Expense.date).desc())
+            .limit(limit))
+    return [d for (d,) in rows]
+
+def rebuild_suggestions(user_id=None):
+    q = (db.session.query(Expense.user_id, Expense.description, func.count(Expense.id), func.max(Expense.date))
+         .filter(Expense.user_id.isnot(None))
+         .group_by(Expense.user_id, Expense.description))
+    if user_id is not None:
+        q = q.filter(Expense.user_id == user_id)
+        DescriptionSuggestion.query.filter_by(user_id=user_id).delete()
+    else:
+        DescriptionSuggestion.query.delete()
+    merged = {}
+    for uid, description, uses, last_used in q:
+        key = _key(description)
+        if not key:
+            continue
+        row = merged.setdefault((uid, key), {"user_id": uid, "description_key": key,
+                                             "description": description.strip()[:100], "uses": 0, "last_used": last_used})
+        row["uses"] += uses
+        if last_used > row["last_used"]:
+            row["last_used"] = last_used
+    if merged:
+        db.session.execute(DescriptionSuggestion.__table__.insert(), list(merged.values()))
+    db.session.commit()
+    return len(merged)
+
+# (description, last date, count) entries for every description a query matches.
+def description_entries(q_exp):
+    rows = (q_exp.with_entities(Expense.description, func.max(Expense.date), func.count(Expense.id))
+            .group_by(Expense.description))
+    return [(description, last_used, count) for description, last_used, count in rows]
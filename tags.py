@@ -0,0 +1,104 @@
+from sqlalchemy import func, select, update
+from models import db, Expense, Tag, ExpenseTag
+from rollups import dialect_insert
+
+# --- Normalized expense tags ---
+# Expense.tags holds the canonical comma-separated names for display and export;
+# expense_tag rows mirror it so filters and per-tag totals are index lookups.
+
+MAX_TAG_LENGTH = 40
+
+def parse_tags(raw):
+    names = []
+    for part in (raw or "").split(","):
+        name = part.strip().lstrip("#").strip().lower()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def normalize_tags(raw):
+    return ",".join(parse_tags(raw))
+
+def tag_ids(names):
+    """Map tag names to ids, creating the missing tags."""
+    names = set(names)
+    if not names:
+        return {}
+    ids = dict(db.session.query(Tag.name, Tag.id).filter(Tag.name.in_(names)))
+    missing = names - ids.keys()
+    if missing:
+        insert = dialect_insert()
+        if insert is not None:
+            db.session.execute(insert(Tag).on_conflict_do_nothing(index_elements=["name"]),
+                               [{"name": name} for name in missing])
+        else:
+            db.session.add_all(Tag(name=name) for name in missing)
+            db.session.flush()
+        ids.update(db.session.query(Tag.name, Tag.id).filter(Tag.name.in_(missing)))
+    return ids
+
+def add_expense_tags(rows):
+    # rows: iterable of (expense_id, user_id, tags string)
+    parsed = [(expense_id, user_id, parse_tags(tags)) for expense_id, user_id, tags in rows]
+    ids = tag_ids(name for _, _, names in parsed for name in names)
+    links = [{"expense_id": expense_id, "tag_id": ids[name], "user_id": user_id}
+             for expense_id, user_id, names in parsed for name in names]
+    if links:
+        db.session.execute(ExpenseTag.__table__.insert(), links)
+
+def clear_expense_tags(expense_ids):
+    ExpenseTag.query.filter(ExpenseTag.expense_id.in_(expense_ids)).delete(synchronize_session=False)
+
+# Call after the expense's fields are set, inside the same transaction.
+def sync_expense_tags(expense):
+    expense.tags = normalize_tags(expense.tags)
+    if expense.id is None:
+        db.session.flush()
+    else:
+        clear_expense_tags([expense.id])
+    add_expense_tags([(expense.id, expense.user_id, expense.tags)])
+
+def filter_by_tag(q_exp, tag, user_id=None):
+    # Guests' links have user_id NULL; (user_id, tag_id, expense_id) serves both cases.
+    owner = ExpenseTag.user_id == user_id if user_id is not None else ExpenseTag.user_id.is_(None)
+    tagged = (select(ExpenseTag.expense_id).join(Tag, Tag.id == ExpenseTag.tag_id)
+              .where(Tag.name == tag.strip().lstrip("#").lower(), owner))
+    return q_exp.filter(Expense.id.in_(tagged))
+
+def tag_totals(q_exp, start=None, limit=10):
+    q = (q_exp.join(ExpenseTag, ExpenseTag.expense_id == Expense.id)
+         .join(Tag, Tag.id == ExpenseTag.tag_id))
+    if start:
+        q = q.filter(Expense.date >= start)
+    total = func.sum(Expense.base_amount)
+    rows = (q.with_entities(Tag.name, total, func.count(Expense.id))
+            .group_by(Tag.name).order_by(total.desc()).limit(limit).all())
+    return [(name, amount or 0, count) for name, amount, count in rows]
+
+def merge_guest_tags(q_exp, user_id):
+    # Run before the guest's expenses are re-owned, while q_exp still selects them.
+    ExpenseTag.query.filter(ExpenseTag.expense_id.in_(q_exp.with_entities(Expense.id))) \
+        .update({"user_id": user_id}, synchronize_session=False)
+
+def rebuild_tags(user_id=None, batch_size=5000):
+    links = ExpenseTag.query
+    q = Expense.query.filter(Expense.tags.isnot(None), Expense.tags != "")
+    if user_id is not None:
+        links = links.filter(ExpenseTag.user_id == user_id)
+        q = q.filter(Expense.user_id == user_id)
+    links.delete(synchronize_session=False)
+    count, last_id = 0, 0
+    columns = q.with_entities(Expense.id, Expense.user_id, Expense.tags).order_by(Expense.id)
+    while True:
+        rows = columns.filter(Expense.id > last_id).limit(batch_size).all()
+        if not rows:
+            break
+        add_expense_tags(rows)
+        # Rows saved before tags were normalized (e.g. "Breakfast, cafe") get the canonical string.
+        renamed = [{"id": r.id, "tags": normalize_tags(r.tags)} for r in rows if normalize_tags(r.tags) != r.tags]
+        if renamed:
+            db.session.execute(update(Expense), renamed)
+        count += len(rows)
+        last_id = rows[-1].id
+    db.session.commit()
+    return count
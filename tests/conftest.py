@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# One throwaway database for the session, set up before app.py reads its config at
+# import: SQLite in a temp dir, or TEST_DATABASE_URL (e.g. a scratch PostgreSQL
+# database), which is emptied and migrated first.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "tests.db")
+os.environ["RESPONSE_CACHE_BACKEND"] = "none"  # measure the queries, not cache hits
+os.environ["COMPRESS_RESPONSES"] = "0"
+# A TTL-driven cache re-check would add a statement to whichever request happens to hit it.
+os.environ["CATEGORY_CACHE_TTL"] = os.environ["FX_CACHE_TTL"] = "3600"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if TEST_DATABASE_URL:
+    from init_db import init_database
+    init_database(reset=True)
+
+from app import app as flask_app, db
+from seed_data import generate
+
+def pytest_addoption(parser):
+    parser.addoption("--run-slow", action="store_true", help="also run tests marked slow (minutes of seeding)")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: production-scale data; skipped unless --run-slow")
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip = pytest.mark.skip(reason="needs --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+@pytest.fixture(scope="session")
+def app():
+    return flask_app
+
+@pytest.fixture(scope="session")
+def seeded_user(app):
+    """seeded_user(prefix, expenses) -> logged-in test client for a user with that many expenses."""
+    seeded = set()
+
+    def login(prefix, expenses):
+        if prefix not in seeded:
+            with app.app_context():
+                generate(1, expenses, 24, 730, seed=7, prefix=prefix, password="pw", verbose=False)
+            seeded.add(prefix)
+        client = app.test_client()
+        client.post("/login", data={"username": f"{prefix}0", "password": "pw"})
+        return client
+
+    return login
+
+@pytest.fixture(scope="session")
+def engine(app):
+    with app.app_context():
+        return db.engine
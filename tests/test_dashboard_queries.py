@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import event
+
+# Dashboard stats come from the rollups, so a request costs a fixed set of statements
+# however many expenses the user has: user load, period and category sums (current and
+# previous period), income, tag totals, budgets and the two short recent lists.
+MAX_QUERIES = 12
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def queries_for(engine, client, url):
+    client.get(url)  # warm the category and FX caches
+    with count_queries(engine) as statements:
+        response = client.get(url)
+        response.get_data()
+    assert response.status_code == 200
+    return statements
+
+DASHBOARD_URLS = [
+    "/",
+    "/api/dashboard",
+    "/api/dashboard?from={year_ago}&granularity=week",
+    "/api/dashboard?from={year_ago}&to={today}&granularity=day",
+]
+
+@pytest.mark.parametrize("url", DASHBOARD_URLS)
+def test_dashboard_queries_are_bounded_and_independent_of_rows(engine, seeded_user, url):
+    today = date.today()
+    url = url.format(today=today.isoformat(), year_ago=(today - timedelta(days=365)).isoformat())
+    few = queries_for(engine, seeded_user("dash-few", 50), url)
+    many = queries_for(engine, seeded_user("dash-many", 20000), url)
+    assert len(few) <= MAX_QUERIES, "\n".join(few)
+    assert len(many) == len(few), "\n".join(many)
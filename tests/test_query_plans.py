@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import event, text
+
+# Every SELECT a route issues (for a logged-in user and for a guest) is EXPLAINed;
+# a full scan of one of CHECKED_TABLES fails the test. On PostgreSQL sequential
+# scans are disabled first, so any remaining "Seq Scan" means no usable index.
+
+CHECKED_TABLES = ("expense", "income", "daily_rollup", "monthly_rollup", "description_suggestion", "expense_tag",
+                  "category_monthly_rollup", "category_budget", "budget_alert")
+
+ROUTES = [
+    "/",
+    "/api/dashboard",
+    "/api/dashboard?from={month}&to={today}&granularity=week",
+    "/expenses",
+    "/search",
+    "/search?category=1",
+    "/search?date_from={month}",
+    "/search?date_from={month}&date_to={today}",
+    "/search?category=2&date_from={month}&date_to={today}",
+    "/search?category=2&cursor={today}_999999",
+    "/api/expenses?per_page=5&cursor={today}_999999",
+    "/api/expenses?date_from={month}&date_to={today}&cursor={today}_999999",
+    "/export_expenses",
+    "/export_expenses?category=1&date_from={month}",
+    "/search?tag=cafe",
+    "/search?tag=cafe&date_from={month}",
+    "/export_expenses?tag=cafe",
+    "/print_report?tag=cafe",
+    "/search?q=coffee",
+    "/search?q=cof&category=1&date_from={month}",
+    "/api/expenses?q=coffee&cursor=10",
+    "/export_expenses?q=coffee",
+    "/print_report?q=coffee",
+    "/print_report",
+    "/print_report?category=1&date_from={month}&date_to={today}",
+    "/suggest_descriptions?q=Co",
+    "/api/budgets",
+    "/profile",
+]
+
+def capture_statements(engine, client, url):
+    captured = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        # Streamed bodies (export_expenses) only run their queries while being read.
+        response = client.get(url)
+        response.get_data()
+        response.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+def full_scans(conn, statement, parameters):
+    if conn.dialect.name == "sqlite":
+        plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        details = [row[-1].split() for row in plan]
+        # "SCAN <table> [AS alias]"; FTS lookups show up as "SCAN <x>_fts VIRTUAL TABLE INDEX ..."
+        return [" ".join(d) for d in details
+                if len(d) > 1 and d[0] == "SCAN" and d[1] in CHECKED_TABLES and "VIRTUAL" not in d]
+    conn.exec_driver_sql("SET enable_seqscan = off")
+    plan = conn.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+    return [row[0].strip() for row in plan if any(f"Seq Scan on {t}" in row[0] for t in CHECKED_TABLES)]
+
+def seed(client, today, signup=True):
+    if signup:
+        client.post("/signup", data={"username": "plan-check", "password": "plan-check"})
+        client.post("/login", data={"username": "plan-check", "password": "plan-check"})
+    for i in range(30):
+        client.post("/add", data={"amount": str(10 + i), "description": f"Coffee {i}", "category": str(1 + i % 3),
+                                  "date": (today - timedelta(days=i)).isoformat(), "tags": "cafe"})
+    client.post("/add_income", data={"amount": "1000", "source": "Salary", "date": today.isoformat()})
+
+@pytest.fixture(scope="module")
+def clients(app):
+    # Requests run outside a shared app context so each one resolves its own user.
+    today = date.today()
+    user_client, guest_client = app.test_client(), app.test_client()
+    seed(user_client, today)
+    seed(guest_client, today, signup=False)
+    return {"user": user_client, "guest": guest_client}
+
+@pytest.mark.parametrize("who", ["user", "guest"])
+@pytest.mark.parametrize("route", ROUTES)
+def test_query_plans_use_indexes(engine, clients, who, route):
+    today = date.today()
+    url = route.format(today=today.isoformat(), month=today.replace(day=1).isoformat())
+    statements = [(s, p) for s, p in capture_statements(engine, clients[who], url)
+                  if any(t in s for t in CHECKED_TABLES)]
+    failures = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            scans = full_scans(conn, statement, parameters)
+            if scans:
+                failures.append(f"full scan ({'; '.join(scans)}): {' '.join(statement.split())}")
+        if conn.dialect.name != "sqlite":
+            conn.execute(text("RESET enable_seqscan"))
+    assert not failures, "\n".join(failures)
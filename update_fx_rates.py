@@ -0,0 +1,22 @@
+import sys
+from app import app, db
+from fx import load_rates, renormalize
+from rollups import rebuild_rollups
+from response_cache import bump_all_data_versions
+
+# Loads dated rates from a CSV (date,currency,rate; default FX_RATES_FILE), then
+# recomputes every base_amount in SQL and rebuilds the rollups from the new values.
+def main():
+    with app.app_context():
+        path = sys.argv[1] if len(sys.argv) > 1 else app.config["FX_RATES_FILE"]
+        loaded = load_rates(path)
+        print(f"✅ Loaded {loaded} FX rates from {path}")
+        unconverted = renormalize()
+        print(f"✅ Base-currency amounts recomputed ({unconverted} rows have no rate for their currency)")
+        daily, monthly = rebuild_rollups()
+        print(f"✅ Rollups rebuilt: {daily} daily rows, {monthly} monthly rows")
+        bump_all_data_versions()
+        db.session.commit()
+
+if __name__ == "__main__":
+    main()